@@ -1,29 +1,60 @@
 import os
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Response
 from contextlib import asynccontextmanager
-from backend.utils import create_tables, close_db, seed_database, AsyncSessionLocal
+from backend.utils import close_db, seed_database, engine, AsyncSessionLocal, password_executor
+from backend.utils.seed_data import is_seeded
+from backend.utils.logger import AppLogger
+from backend.utils.sale_recorder import sale_writer
+from backend.utils.metrics import (
+    METRICS_ENABLED,
+    CONTENT_TYPE,
+    MetricsMiddleware,
+    registry,
+    instrument_engine,
+    instrument_password_executor,
+)
+from backend.utils.query_stats import SQL_INSTRUMENTATION_ENABLED, QueryStatsMiddleware, instrument_queries
+from backend.migrations import upgrade, verify_schema
 from backend.routes import (
     login_router,
     products_router,
     suppliers_router,
     inventory_router,
     orders_router,
-    sales_router
+    sales_router,
+    analytics_router,
 )
 from dotenv import load_dotenv
 load_dotenv()
 
+logger = AppLogger.get_logger(__name__)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup code
-    await create_tables()
+    AppLogger.start()
+    # Schema changes are applied with `python -m backend.cli migrate upgrade`;
+    # MIGRATE_ON_STARTUP is meant for single-process development setups
+    if os.getenv("MIGRATE_ON_STARTUP", "false").lower() == "true":
+        await upgrade()
+    await verify_schema()
     async with AsyncSessionLocal() as session:
-        await seed_database(session)
+        # Seeding is done by `python -m backend.cli seed`; workers only check the marker
+        if not await is_seeded(session):
+            if os.getenv("SEED_ON_STARTUP", "false").lower() == "true":
+                await seed_database(session)
+            else:
+                logger.warning("Database has not been seeded; run `python -m backend.cli seed`")
+    if os.getenv("SALES_WRITE_BEHIND_ENABLED", "false").lower() == "true":
+        sale_writer.start()
 
     yield
 
     # shutdown code
+    await sale_writer.stop()
+    password_executor.shutdown()
     await close_db()
+    AppLogger.shutdown()
 
 app = FastAPI(
     title="Inventory Management API",
@@ -32,6 +63,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+if SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+    instrument_queries(engine)
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    instrument_password_executor(password_executor)
+
 api_v1_router = APIRouter(prefix=os.getenv("API_BASE_PREFIX"))
 api_v1_router.include_router(login_router)
 api_v1_router.include_router(products_router)
@@ -39,6 +79,7 @@ api_v1_router.include_router(suppliers_router)
 api_v1_router.include_router(inventory_router)
 api_v1_router.include_router(orders_router)
 api_v1_router.include_router(sales_router)
+api_v1_router.include_router(analytics_router)
 app.include_router(api_v1_router)
 
 @app.get("/")
@@ -47,5 +88,15 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "API is running"}
+    return {
+        "status": "API is running",
+        "password_executor": {
+            "in_flight": password_executor.in_flight,
+            **password_executor.stats.snapshot(),
+        },
+    }
 
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+
+from backend.utils import AsyncSessionLocal, close_db
+from backend.utils.logger import AppLogger
+
+logger = AppLogger.get_logger(__name__)
+
+async def backfill_line_items_command(args: argparse.Namespace) -> None:
+    from backend.utils.line_items import backfill_line_items
+
+    async with AsyncSessionLocal() as session:
+        counts = await backfill_line_items(session, batch_size=args.batch_size)
+    logger.info("Backfilled line items for %s orders and %s sales", counts['orders'], counts['sales'])
+
+async def rebuild_rollups_command(args: argparse.Namespace) -> None:
+    from backend.utils.rollups import rebuild_rollups
+
+    async with AsyncSessionLocal() as session:
+        counts = await rebuild_rollups(session, batch_size=args.batch_size)
+    logger.info("Rebuilt %s order rollup rows and %s sales rollup rows", counts['orders'], counts['sales'])
+
+async def purge_idempotency_keys_command(args: argparse.Namespace) -> None:
+    from backend.utils.idempotency import idempotency_store
+
+    async with AsyncSessionLocal() as session:
+        purged = await idempotency_store.purge_expired(session)
+    logger.info("Purged %s expired idempotency keys", purged)
+
+async def purge_sale_handles_command(args: argparse.Namespace) -> None:
+    from backend.utils.sale_recorder import sale_writer
+
+    async with AsyncSessionLocal() as session:
+        purged = await sale_writer.purge_expired(session)
+    logger.info("Purged %s expired sale handles", purged)
+
+async def purge_refresh_tokens_command(args: argparse.Namespace) -> None:
+    from backend.utils.auth import purge_expired_refresh_tokens
+
+    async with AsyncSessionLocal() as session:
+        purged = await purge_expired_refresh_tokens(session)
+        await session.commit()
+    logger.info("Purged %s expired refresh tokens", purged)
+
+async def seed_command(args: argparse.Namespace) -> None:
+    from backend.utils.seed_data import seed_database
+
+    async with AsyncSessionLocal() as session:
+        await seed_database(session)
+
+async def generate_command(args: argparse.Namespace) -> None:
+    from backend.utils.synthetic_data import generate_dataset
+
+    async with AsyncSessionLocal() as session:
+        try:
+            counts = await generate_dataset(
+                session,
+                suppliers=args.suppliers,
+                products=args.products,
+                orders=args.orders,
+                sales=args.sales,
+                days=args.days,
+                batch_size=args.batch_size,
+                zipf_exponent=args.zipf_exponent,
+                seed=args.seed,
+            )
+        except ValueError as e:
+            raise SystemExit(f"generate: error: {e}")
+    logger.info("Generated %s", ", ".join(f"{count} {name}" for name, count in counts.items()))
+
+async def migrate_command(args: argparse.Namespace) -> None:
+    from backend.migrations import HEAD_VERSION, current_version, upgrade, downgrade
+
+    if args.action == "current":
+        logger.info("Schema version %s (head %s)", await current_version(), HEAD_VERSION)
+    elif args.action == "upgrade":
+        applied = await upgrade(args.to)
+        if applied:
+            logger.info("Applied migrations %s", applied)
+        else:
+            logger.info("Schema already up to date")
+    else:
+        reverted = await downgrade(args.to)
+        if reverted:
+            logger.info("Reverted migrations %s", reverted)
+        else:
+            logger.info("Nothing to revert")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend.cli", description="Inventory Management API maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill = subparsers.add_parser("backfill-line-items", help="Populate order_items/sale_items from existing order and sale JSON")
+    backfill.add_argument("--batch-size", type=int, default=1000)
+    backfill.set_defaults(handler=backfill_line_items_command)
+
+    rollups = subparsers.add_parser("rebuild-rollups", help="Recompute order/sales rollups from order_items/sale_items")
+    rollups.add_argument("--batch-size", type=int, default=5000)
+    rollups.set_defaults(handler=rebuild_rollups_command)
+
+    idempotency = subparsers.add_parser("purge-idempotency-keys", help="Delete expired Idempotency-Key records")
+    idempotency.set_defaults(handler=purge_idempotency_keys_command)
+
+    sale_handles = subparsers.add_parser("purge-sale-handles", help="Delete expired async sale outcomes")
+    sale_handles.set_defaults(handler=purge_sale_handles_command)
+
+    refresh_tokens = subparsers.add_parser("purge-refresh-tokens", help="Delete expired refresh token records")
+    refresh_tokens.set_defaults(handler=purge_refresh_tokens_command)
+
+    seed = subparsers.add_parser("seed", help="Load the default user, suppliers, products and inventory into empty tables")
+    seed.set_defaults(handler=seed_command)
+
+    generate = subparsers.add_parser("generate", help="Bulk-load a synthetic catalog and order/sale history for scale testing")
+    generate.add_argument("--suppliers", type=int, default=100)
+    generate.add_argument("--products", type=int, default=10000)
+    generate.add_argument("--orders", type=int, default=100000)
+    generate.add_argument("--sales", type=int, default=100000)
+    generate.add_argument("--days", type=int, default=90, help="Spread timestamps over this many days up to today")
+    generate.add_argument("--batch-size", type=int, default=5000)
+    generate.add_argument("--zipf-exponent", type=float, default=1.1, help="Skew of product popularity (higher is more skewed)")
+    generate.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible datasets")
+    generate.set_defaults(handler=generate_command)
+
+    migrate = subparsers.add_parser("migrate", help="Apply, revert or inspect schema migrations")
+    migrate_actions = migrate.add_subparsers(dest="action", required=True)
+    migrate_upgrade = migrate_actions.add_parser("upgrade", help="Apply migrations up to --to (default: latest)")
+    migrate_upgrade.add_argument("--to", type=int, default=None)
+    migrate_downgrade = migrate_actions.add_parser("downgrade", help="Revert migrations newer than --to")
+    migrate_downgrade.add_argument("--to", type=int, required=True)
+    migrate_actions.add_parser("current", help="Print the applied schema version")
+    migrate.set_defaults(handler=migrate_command)
+
+    return parser
+
+async def run(args: argparse.Namespace) -> None:
+    try:
+        await args.handler(args)
+    finally:
+        await close_db()
+
+def main() -> None:
+    args = build_parser().parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
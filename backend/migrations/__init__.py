@@ -0,0 +1,81 @@
+"""Versioned schema migrations.
+
+Migrations run on a sync connection (via run_sync), each in its own
+transaction, and record themselves in the schema_version table. Each
+migration declares the tables it touches itself instead of importing the
+models, so upgrading gives the same schema whenever it is run. Databases
+built by create_all before migrations existed start at version 0, so each
+migration still tolerates its change already being present.
+"""
+
+from typing import Optional
+from sqlalchemy import Connection, delete, func, insert, inspect, select
+
+from backend.utils.database import engine
+from backend.utils.logger import AppLogger
+from backend.models import DBSchemaVersion
+from backend.migrations.versions import MIGRATIONS
+
+logger = AppLogger.get_logger(__name__)
+
+HEAD_VERSION = MIGRATIONS[-1].version
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+def _current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table(DBSchemaVersion.__tablename__):
+        return 0
+    return conn.execute(select(func.max(DBSchemaVersion.version))).scalar() or 0
+
+def _apply(conn: Connection, migration) -> None:
+    DBSchemaVersion.__table__.create(conn, checkfirst=True)
+    migration.upgrade(conn)
+    conn.execute(insert(DBSchemaVersion).values(version=migration.version, description=migration.description))
+
+def _revert(conn: Connection, migration) -> None:
+    migration.downgrade(conn)
+    conn.execute(delete(DBSchemaVersion).where(DBSchemaVersion.version == migration.version))
+
+async def current_version() -> int:
+    async with engine.connect() as conn:
+        return await conn.run_sync(_current_version)
+
+async def upgrade(target: Optional[int] = None) -> list[int]:
+    target = HEAD_VERSION if target is None else target
+    applied = []
+
+    for migration in MIGRATIONS:
+        if migration.version > target:
+            break
+        async with engine.begin() as conn:
+            if migration.version <= await conn.run_sync(_current_version):
+                continue
+            logger.info("Applying migration %04d: %s", migration.version, migration.description)
+            await conn.run_sync(_apply, migration)
+        applied.append(migration.version)
+
+    return applied
+
+async def downgrade(target: int) -> list[int]:
+    reverted = []
+
+    for migration in reversed(MIGRATIONS):
+        if migration.version <= target:
+            break
+        async with engine.begin() as conn:
+            if migration.version > await conn.run_sync(_current_version):
+                continue
+            logger.info("Reverting migration %04d: %s", migration.version, migration.description)
+            await conn.run_sync(_revert, migration)
+        reverted.append(migration.version)
+
+    return reverted
+
+async def verify_schema() -> None:
+    version = await current_version()
+    if version != HEAD_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, expected {HEAD_VERSION}; "
+            "run `python -m backend.cli migrate upgrade`"
+        )
@@ -0,0 +1,28 @@
+from sqlalchemy import Connection, inspect, text
+
+def index_exists(conn: Connection, table: str, name: str) -> bool:
+    return any(index["name"] == name for index in inspect(conn).get_indexes(table))
+
+def create_index(conn: Connection, name: str, table: str, columns: list[str], fulltext: bool = False) -> None:
+    """CREATE INDEX unless an index with that name is already there (e.g. built by create_all)."""
+
+    if index_exists(conn, table, name):
+        return
+
+    preparer = conn.dialect.identifier_preparer
+    kind = "FULLTEXT INDEX" if fulltext else "INDEX"
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    conn.execute(text(f"CREATE {kind} {preparer.quote(name)} ON {preparer.quote(table)} ({column_list})"))
+
+def drop_index(conn: Connection, name: str, table: str) -> None:
+    if not index_exists(conn, table, name):
+        return
+
+    preparer = conn.dialect.identifier_preparer
+    if conn.dialect.name in ("mysql", "mariadb"):
+        conn.execute(text(f"DROP INDEX {preparer.quote(name)} ON {preparer.quote(table)}"))
+    else:
+        conn.execute(text(f"DROP INDEX {preparer.quote(name)}"))
+
+def is_mysql(conn: Connection) -> bool:
+    return conn.dialect.name in ("mysql", "mariadb")
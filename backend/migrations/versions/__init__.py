@@ -0,0 +1,9 @@
+from . import v0001_initial_schema, v0002_secondary_indexes, v0003_app_metadata, v0004_sale_handles
+
+# Applied in this order; each module defines version, description, upgrade(conn) and downgrade(conn)
+MIGRATIONS = [
+    v0001_initial_schema,
+    v0002_secondary_indexes,
+    v0003_app_metadata,
+    v0004_sale_handles,
+]
@@ -0,0 +1,160 @@
+"""Baseline schema, written out as it stood when migrations were introduced.
+
+The tables are declared here rather than taken from backend.models, so a fresh
+database always starts from this baseline and later migrations apply on top of
+it. Tables that already exist (deployments that predate migrations and were
+built by create_all at startup) are left untouched; later migrations bring
+them up to date.
+"""
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Connection,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+)
+
+version = 1
+description = "initial schema"
+
+metadata = MetaData()
+
+Table(
+    "users",
+    metadata,
+    Column("user_id", Integer, primary_key=True, autoincrement=True),
+    Column("username", String(100), unique=True, nullable=False),
+    Column("password", String(255), nullable=False),
+)
+
+Table(
+    "refresh_tokens",
+    metadata,
+    Column("token_id", String(64), primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.user_id"), nullable=False, index=True),
+    Column("expires_at", DateTime, nullable=False),
+    Column("revoked_at", DateTime),
+    Column("replaced_by", String(64)),
+    Column("created_at", DateTime, server_default=func.now()),
+)
+
+Table(
+    "idempotency_keys",
+    metadata,
+    Column("idempotency_key", String(255), primary_key=True),
+    Column("request_hash", String(64), nullable=False),
+    Column("status_code", Integer, nullable=False),
+    Column("response_body", JSON, nullable=False),
+    Column("created_at", DateTime, server_default=func.now()),
+    Column("expires_at", DateTime, nullable=False, index=True),
+)
+
+Table(
+    "table_versions",
+    metadata,
+    Column("table_name", String(64), primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+Table(
+    "suppliers",
+    metadata,
+    Column("supplier_id", Integer, primary_key=True, autoincrement=True),
+    Column("supplier_name", String(200), nullable=False),
+    Column("location", String(200)),
+    Column("contact_email", String(100)),
+    Column("reliability_score", Float),
+)
+
+Table(
+    "products",
+    metadata,
+    Column("product_id", Integer, primary_key=True, autoincrement=True),
+    Column("product_name", String(200), nullable=False),
+    Column("category", String(100)),
+    Column("unit_price", Float, nullable=False),
+    Column("supplier_id", Integer, ForeignKey("suppliers.supplier_id")),
+)
+
+Table(
+    "inventory",
+    metadata,
+    Column("product_id", Integer, ForeignKey("products.product_id"), primary_key=True),
+    Column("quantity", Integer, nullable=False),
+    Column("last_updated", DateTime, server_default=func.now()),
+)
+
+Table(
+    "orders",
+    metadata,
+    Column("order_id", Integer, primary_key=True, autoincrement=True),
+    Column("order_details", JSON, nullable=False),
+    Column("total_amount", Float, nullable=False),
+    Column("timestamp", DateTime, server_default=func.now()),
+)
+
+Table(
+    "order_items",
+    metadata,
+    Column("order_item_id", Integer, primary_key=True, autoincrement=True),
+    Column("order_id", Integer, ForeignKey("orders.order_id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("product_id", Integer, nullable=False),
+    Column("supplier_id", Integer),
+    Column("quantity", Integer, nullable=False),
+    Column("unit_price", Float, nullable=False),
+    Column("subtotal", Float, nullable=False),
+    Column("timestamp", DateTime, nullable=False),
+    Index("ix_order_items_product_id_timestamp", "product_id", "timestamp"),
+    Index("ix_order_items_supplier_id", "supplier_id"),
+)
+
+Table(
+    "sales",
+    metadata,
+    Column("sale_id", Integer, primary_key=True, autoincrement=True),
+    Column("sale_details", JSON, nullable=False),
+    Column("total_amount", Float, nullable=False),
+    Column("timestamp", DateTime, server_default=func.now()),
+)
+
+Table(
+    "sale_items",
+    metadata,
+    Column("sale_item_id", Integer, primary_key=True, autoincrement=True),
+    Column("sale_id", Integer, ForeignKey("sales.sale_id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("product_id", Integer, nullable=False),
+    Column("supplier_id", Integer),
+    Column("quantity", Integer, nullable=False),
+    Column("unit_price", Float, nullable=False),
+    Column("subtotal", Float, nullable=False),
+    Column("timestamp", DateTime, nullable=False),
+    Index("ix_sale_items_product_id_timestamp", "product_id", "timestamp"),
+    Index("ix_sale_items_supplier_id", "supplier_id"),
+)
+
+for rollup_table in ("sales_rollups", "order_rollups"):
+    Table(
+        rollup_table,
+        metadata,
+        Column("granularity", String(8), primary_key=True),
+        Column("bucket_start", DateTime, primary_key=True),
+        Column("product_id", Integer, primary_key=True),
+        Column("supplier_id", Integer),
+        Column("units", Integer, nullable=False),
+        Column("amount", Float, nullable=False),
+        Index(f"ix_{rollup_table}_supplier_bucket", "granularity", "supplier_id", "bucket_start"),
+    )
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn, checkfirst=True)
+
+def downgrade(conn: Connection) -> None:
+    metadata.drop_all(conn, checkfirst=True)
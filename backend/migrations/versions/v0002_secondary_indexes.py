@@ -0,0 +1,32 @@
+"""Secondary indexes for list filters, product search and time-range scans."""
+
+from sqlalchemy import Connection
+
+from backend.migrations.ops import create_index, drop_index, is_mysql
+
+version = 2
+description = "secondary indexes"
+
+INDEXES = [
+    ("ix_products_supplier_id", "products", ["supplier_id"]),
+    ("ix_products_category_unit_price", "products", ["category", "unit_price"]),
+    ("ix_products_product_name", "products", ["product_name"]),
+    ("ix_inventory_quantity", "inventory", ["quantity"]),
+    ("ix_suppliers_location", "suppliers", ["location"]),
+    ("ix_orders_timestamp", "orders", ["timestamp"]),
+    ("ix_sales_timestamp", "sales", ["timestamp"]),
+]
+FULLTEXT_INDEXES = [
+    ("ix_products_product_name_fulltext", "products", ["product_name"]),
+]
+
+def upgrade(conn: Connection) -> None:
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
+    if is_mysql(conn):
+        for name, table, columns in FULLTEXT_INDEXES:
+            create_index(conn, name, table, columns, fulltext=True)
+
+def downgrade(conn: Connection) -> None:
+    for name, table, _ in reversed(INDEXES + FULLTEXT_INDEXES):
+        drop_index(conn, name, table)
@@ -0,0 +1,34 @@
+"""app_metadata key/value table, holding the seeded marker checked at startup.
+
+Databases that were seeded by the old startup hook already have users, so they
+get the marker here instead of being reported as unseeded.
+"""
+
+from sqlalchemy import Column, Connection, DateTime, MetaData, String, Table, column, exists, func, insert, select, table
+
+version = 3
+description = "app metadata and seeded marker"
+
+metadata = MetaData()
+
+app_metadata = Table(
+    "app_metadata",
+    metadata,
+    Column("key", String(64), primary_key=True),
+    Column("value", String(255), nullable=False),
+    Column("updated_at", DateTime, server_default=func.now()),
+)
+users = table("users", column("user_id"))
+
+# Frozen copy of seed_data.SEED_MARKER_KEY as it was when this migration was written
+SEED_MARKER_KEY = "seeded"
+
+def upgrade(conn: Connection) -> None:
+    app_metadata.create(conn, checkfirst=True)
+
+    already_marked = conn.execute(select(exists().where(app_metadata.c.key == SEED_MARKER_KEY))).scalar()
+    if not already_marked and conn.execute(select(exists(select(users.c.user_id)))).scalar():
+        conn.execute(insert(app_metadata).values(key=SEED_MARKER_KEY, value="true"))
+
+def downgrade(conn: Connection) -> None:
+    app_metadata.drop(conn, checkfirst=True)
@@ -0,0 +1,25 @@
+"""sale_handles table, so write-behind sale outcomes can be polled from any worker."""
+
+from sqlalchemy import JSON, Column, Connection, DateTime, Integer, MetaData, String, Table, func
+
+version = 4
+description = "sale handles"
+
+metadata = MetaData()
+
+sale_handles = Table(
+    "sale_handles",
+    metadata,
+    Column("handle", String(32), primary_key=True),
+    Column("status", String(16), nullable=False),
+    Column("sale_id", Integer),
+    Column("detail", JSON),
+    Column("created_at", DateTime, server_default=func.now()),
+    Column("expires_at", DateTime, nullable=False, index=True),
+)
+
+def upgrade(conn: Connection) -> None:
+    sale_handles.create(conn, checkfirst=True)
+
+def downgrade(conn: Connection) -> None:
+    sale_handles.drop(conn, checkfirst=True)
@@ -10,11 +10,21 @@ from .data_models import (
 )
 from .database_models import (
     User as DBUser,
+    RefreshToken as DBRefreshToken,
+    IdempotencyKey as DBIdempotencyKey,
+    SaleHandle as DBSaleHandle,
+    SchemaVersion as DBSchemaVersion,
+    AppMetadata as DBAppMetadata,
+    TableVersion as DBTableVersion,
     Product as DBProduct,
     Supplier as DBSupplier,
     Inventory as DBInventory,
     Sale as DBSale,
+    SaleItem as DBSaleItem,
     Order as DBOrder,
+    OrderItem as DBOrderItem,
+    SalesRollup as DBSalesRollup,
+    OrderRollup as DBOrderRollup,
 )
 from .api_models import (
     GetProductsResponse,
@@ -23,6 +33,9 @@ from .api_models import (
     GetSuppliersResponse,
     CreateSupplierRequest,
     UpdateSupplierRequest,
+    RefreshTokenRequest,
+    AnalyticsBucket,
+    AnalyticsResponse,
 )
 
 __all__ = [
@@ -35,15 +48,28 @@ __all__ = [
     "Order",
     "OrderDetail",
     "DBUser",
+    "DBRefreshToken",
+    "DBIdempotencyKey",
+    "DBSaleHandle",
+    "DBSchemaVersion",
+    "DBAppMetadata",
+    "DBTableVersion",
     "DBProduct",
     "DBSupplier",
     "DBInventory",
     "DBSale",
+    "DBSaleItem",
     "DBOrder",
+    "DBOrderItem",
+    "DBSalesRollup",
+    "DBOrderRollup",
     "GetProductsResponse",
     "CreateProductRequest",
     "UpdateProductRequest",
     "GetSuppliersResponse",
     "CreateSupplierRequest",
     "UpdateSupplierRequest",
+    "RefreshTokenRequest",
+    "AnalyticsBucket",
+    "AnalyticsResponse",
 ]
\ No newline at end of file
@@ -1,10 +1,15 @@
 from pydantic import BaseModel, EmailStr
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
+from datetime import datetime
 from backend.models.data_models import Product, Supplier
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class GetProductsResponse(BaseModel):
-    count: int
+    count: Optional[int] = None
     products: List[Product]
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -23,8 +28,9 @@ class UpdateProductRequest(BaseModel):
     supplier_id: int
 
 class GetSuppliersResponse(BaseModel):
-    count: int
+    count: Optional[int] = None
     suppliers: List[Supplier]
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -46,4 +52,33 @@ class CreateOrderRequest(BaseModel):
     order_items: List[Dict]
 
 class CreateSaleRequest(BaseModel):
-    sale_items: List[Dict]
\ No newline at end of file
+    sale_items: List[Dict]
+
+class CreateOrdersBatchRequest(BaseModel):
+    orders: List[CreateOrderRequest]
+
+class CreateSalesBatchRequest(BaseModel):
+    sales: List[CreateSaleRequest]
+
+class BatchEntryResult(BaseModel):
+    index: int
+    success: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+    short_items: Optional[List[Dict]] = None
+
+class BatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchEntryResult]
+
+class AnalyticsBucket(BaseModel):
+    bucket_start: datetime
+    key: Optional[Union[int, str]] = None
+    units: int
+    amount: float
+
+class AnalyticsResponse(BaseModel):
+    granularity: str
+    group_by: str
+    buckets: List[AnalyticsBucket]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
 from backend.utils import Base
 
@@ -10,18 +10,80 @@ class User(Base):
     password = Column(String(255), nullable=False)  # Store hashed passwords
 
 
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    token_id = Column(String(64), primary_key=True)  # JWT "jti" claim
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime)
+    replaced_by = Column(String(64))  # token_id issued when this one was rotated
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    idempotency_key = Column(String(255), primary_key=True)  # "<scope>:<user_id>:<client key>"
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(JSON, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class SaleHandle(Base):
+    __tablename__ = "sale_handles"
+
+    handle = Column(String(32), primary_key=True)  # Returned by POST /sales?async_mode=true
+    status = Column(String(16), nullable=False)  # "committed" or "failed"
+    sale_id = Column(Integer)
+    detail = Column(JSON)  # Error and short items of a failed sale
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)  # One row per applied migration
+    description = Column(String(200), nullable=False)
+    applied_at = Column(DateTime, server_default=func.now())
+
+
+class AppMetadata(Base):
+    __tablename__ = "app_metadata"
+
+    key = Column(String(64), primary_key=True)
+    value = Column(String(255), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # Bumped on every write to the table
+
+
 class Supplier(Base):
     __tablename__ = "suppliers"
     
     supplier_id = Column(Integer, primary_key=True, autoincrement=True)
     supplier_name = Column(String(200), nullable=False)
-    location = Column(String(200))
+    location = Column(String(200), index=True)
     contact_email = Column(String(100))
     reliability_score = Column(Float)
 
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_category_unit_price", "category", "unit_price"),
+        Index("ix_products_supplier_id", "supplier_id"),
+        Index("ix_products_product_name", "product_name"),  # Prefix (LIKE 'term%') search
+        Index("ix_products_product_name_fulltext", "product_name", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
     
     product_id = Column(Integer, primary_key=True, autoincrement=True)
     product_name = Column(String(200), nullable=False)
@@ -34,7 +96,7 @@ class Inventory(Base):
     __tablename__ = "inventory"
     
     product_id = Column(Integer, ForeignKey("products.product_id"), primary_key=True)
-    quantity = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0, index=True)
     last_updated = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
 
@@ -44,7 +106,24 @@ class Order(Base):
     order_id = Column(Integer, primary_key=True, autoincrement=True)
     order_details = Column(JSON, nullable=False)  # Stores array of order items
     total_amount = Column(Float, nullable=False)
-    timestamp = Column(DateTime, server_default=func.now())
+    timestamp = Column(DateTime, server_default=func.now(), index=True)
+
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_product_id_timestamp", "product_id", "timestamp"),
+        Index("ix_order_items_supplier_id", "supplier_id"),
+    )
+
+    order_item_id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, ForeignKey("orders.order_id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, nullable=False)
+    supplier_id = Column(Integer)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(Float, nullable=False)
+    subtotal = Column(Float, nullable=False)
+    timestamp = Column(DateTime, nullable=False)  # Copied from the order header
 
 
 class Sale(Base):
@@ -53,4 +132,49 @@ class Sale(Base):
     sale_id = Column(Integer, primary_key=True, autoincrement=True)
     sale_details = Column(JSON, nullable=False)  # Stores array of sale items
     total_amount = Column(Float, nullable=False)
-    timestamp = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    timestamp = Column(DateTime, server_default=func.now(), index=True)
+
+
+class SaleItem(Base):
+    __tablename__ = "sale_items"
+    __table_args__ = (
+        Index("ix_sale_items_product_id_timestamp", "product_id", "timestamp"),
+        Index("ix_sale_items_supplier_id", "supplier_id"),
+    )
+
+    sale_item_id = Column(Integer, primary_key=True, autoincrement=True)
+    sale_id = Column(Integer, ForeignKey("sales.sale_id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, nullable=False)
+    supplier_id = Column(Integer)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(Float, nullable=False)
+    subtotal = Column(Float, nullable=False)
+    timestamp = Column(DateTime, nullable=False)  # Copied from the sale header
+
+
+class SalesRollup(Base):
+    __tablename__ = "sales_rollups"
+    __table_args__ = (
+        Index("ix_sales_rollups_supplier_bucket", "granularity", "supplier_id", "bucket_start"),
+    )
+
+    granularity = Column(String(8), primary_key=True)  # "hour" or "day"
+    bucket_start = Column(DateTime, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    supplier_id = Column(Integer)
+    units = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0)
+
+
+class OrderRollup(Base):
+    __tablename__ = "order_rollups"
+    __table_args__ = (
+        Index("ix_order_rollups_supplier_bucket", "granularity", "supplier_id", "bucket_start"),
+    )
+
+    granularity = Column(String(8), primary_key=True)  # "hour" or "day"
+    bucket_start = Column(DateTime, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    supplier_id = Column(Integer)
+    units = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0)
\ No newline at end of file
@@ -4,6 +4,7 @@ from .suppliers_routes import router as suppliers_router
 from .inventory_routes import router as inventory_router
 from .orders_routes import router as orders_router
 from .sales_routes import router as sales_router
+from .analytics_routes import router as analytics_router
 
 __all__ = [
     "login_router",
@@ -11,5 +12,6 @@ __all__ = [
     "suppliers_router",
     "inventory_router",
     "orders_router",
-    "sales_router"
+    "sales_router",
+    "analytics_router",
 ]
\ No newline at end of file
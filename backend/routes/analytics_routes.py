@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Literal, Optional
+
+from backend.utils import get_db
+from backend.utils.logger import AppLogger
+from backend.utils.auth import get_current_user
+from backend.utils.rollups import query_rollups, bucket_start
+from backend.models import DBUser, DBSalesRollup, DBOrderRollup
+from backend.models.api_models import AnalyticsResponse
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+logger = AppLogger.get_logger(__name__)
+
+async def get_rollup_analytics(
+    db: AsyncSession,
+    rollup_model,
+    start: datetime,
+    end: datetime,
+    granularity: str,
+    group_by: str,
+    product_id: Optional[int],
+) -> AnalyticsResponse:
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must be after start",
+        )
+    # Rollups only hold whole buckets, so a range that splits one can't be answered exactly
+    if bucket_start(start, granularity) != start or bucket_start(end, granularity) != end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"start and end must be on {granularity} boundaries",
+        )
+
+    buckets = await query_rollups(db, rollup_model, start, end, granularity, group_by, product_id)
+    logger.info("Retrieved %s %s buckets from %s.", len(buckets), granularity, rollup_model.__tablename__)
+
+    return AnalyticsResponse(
+        granularity=granularity,
+        group_by=group_by,
+        buckets=buckets,
+    )
+
+@router.get("/sales", response_model=AnalyticsResponse)
+async def get_sales_analytics(
+    start: datetime = Query(..., description="Range start (inclusive), on a bucket boundary"),
+    end: datetime = Query(..., description="Range end (exclusive), on a bucket boundary"),
+    granularity: Literal["hour", "day"] = Query("day", description="Bucket size"),
+    group_by: Literal["total", "product", "category", "supplier"] = Query("total", description="Grouping key"),
+    product_id: Optional[int] = Query(None, description="Restrict to one product"),
+    db: AsyncSession = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+):
+    logger.info("Retrieving sales analytics from %s to %s...", start, end)
+    return await get_rollup_analytics(db, DBSalesRollup, start, end, granularity, group_by, product_id)
+
+@router.get("/orders", response_model=AnalyticsResponse)
+async def get_orders_analytics(
+    start: datetime = Query(..., description="Range start (inclusive), on a bucket boundary"),
+    end: datetime = Query(..., description="Range end (exclusive), on a bucket boundary"),
+    granularity: Literal["hour", "day"] = Query("day", description="Bucket size"),
+    group_by: Literal["total", "product", "category", "supplier"] = Query("total", description="Grouping key"),
+    product_id: Optional[int] = Query(None, description="Restrict to one product"),
+    db: AsyncSession = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+):
+    logger.info("Retrieving order analytics from %s to %s...", start, end)
+    return await get_rollup_analytics(db, DBOrderRollup, start, end, granularity, group_by, product_id)
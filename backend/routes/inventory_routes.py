@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, Response, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 
 from backend.utils import get_db
 from backend.utils.logger import AppLogger
 from backend.utils.auth import get_current_user
+from backend.utils.pagination import PageParams, apply_keyset, split_page
+from backend.utils.serialization import row_mode, entity_select, entity_rows, entity_row, dump_rows, json_response
+from backend.utils.fieldsets import select_fields
+from backend.utils.etag import make_etag, etag_matches, not_modified, table_version
 from backend.models import Inventory, DBInventory, DBUser
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
@@ -13,27 +16,81 @@ logger = AppLogger.get_logger(__name__)
 
 @router.get("", response_model=List[Inventory])
 async def get_inventory(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBInventory)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
     logger.info("Retrieving full inventory list...")
-    sql_query = select(DBInventory)
-    result = await db.execute(sql_query)
-    inventory = result.scalars().all()
-    logger.info(f"Retrieved {len(inventory)} inventory items.")
+
+    etag = make_etag("inventory", await table_version(db, "inventory"), sorted(request.query_params.multi_items()))
+    if etag_matches(request, etag):
+        logger.info("Inventory list not modified.")
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    sql_query = entity_select(DBInventory, fields)
+    result = await db.execute(apply_keyset(sql_query, [DBInventory.product_id], page))
+    inventory, next_cursor = split_page(entity_rows(result, fields), page, lambda i: [i.product_id])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    logger.info("Retrieved %s inventory items.", len(inventory))
     
+    if row_mode(fields):
+        return json_response(dump_rows(inventory, Inventory, fields), response)
     return inventory
 
 @router.get("/low")
 async def get_low_inventory(
+    request: Request,
+    response: Response,
     min_quantity: int = 3,
+    page: PageParams = Depends(),
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBInventory)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
-    logger.info(f"Retrieving inventory items with quantity below {min_quantity}...")
-    sql_query = select(DBInventory).where(DBInventory.quantity < min_quantity)
-    result = await db.execute(sql_query)
-    inventory = result.scalars().all()
-    logger.info(f"Retrieved {len(inventory)} low inventory items.")
+    logger.info("Retrieving inventory items with quantity below %s...", min_quantity)
+
+    etag = make_etag("inventory", await table_version(db, "inventory"), sorted(request.query_params.multi_items()))
+    if etag_matches(request, etag):
+        logger.info("Low inventory list not modified.")
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    sql_query = entity_select(DBInventory, fields).where(DBInventory.quantity < min_quantity)
+    result = await db.execute(apply_keyset(sql_query, [DBInventory.product_id], page))
+    inventory, next_cursor = split_page(entity_rows(result, fields), page, lambda i: [i.product_id])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    logger.info("Retrieved %s low inventory items.", len(inventory))
     
-    return inventory
\ No newline at end of file
+    if row_mode(fields):
+        return json_response(dump_rows(inventory, Inventory, fields), response)
+    return inventory
+
+@router.get("/{product_id}")
+async def get_inventory_by_product_id(
+    product_id: int,
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBInventory)),
+    db: AsyncSession = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+):
+    logger.info("Retrieving inventory for product ID %s...", product_id)
+    sql_query = entity_select(DBInventory, fields).where(DBInventory.product_id == product_id)
+    result = await db.execute(sql_query)
+    inventory_item = entity_row(result, fields)
+
+    if inventory_item:
+        logger.info("Inventory for product ID %s retrieved successfully.", product_id)
+        if row_mode(fields):
+            return json_response(dump_rows([inventory_item], Inventory, fields)[0])
+        return inventory_item
+    else:
+        logger.warning("Inventory for product ID %s not found.", product_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory item not found",
+        )
\ No newline at end of file
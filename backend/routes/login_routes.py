@@ -1,16 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from datetime import datetime
 
 from backend.utils import get_db
 from backend.utils.logger import AppLogger
-from backend.utils.auth import hash_password, verify_password, create_access_token
-from backend.models import DBUser
+from backend.utils.auth import (
+    create_access_token,
+    create_refresh_token,
+    decode_refresh_token,
+    invalidate_principal,
+    purge_expired_refresh_tokens,
+)
+from backend.utils.password_executor import hash_password_async, verify_password_async
+from backend.models import DBUser, DBRefreshToken
+from backend.models.api_models import RefreshTokenRequest
 
 router = APIRouter(tags=["Authentication"])
 logger = AppLogger.get_logger(__name__)
 
+def issue_refresh_token(db: AsyncSession, username: str, user_id: int) -> tuple[str, str]:
+    token, token_id, expires_at = create_refresh_token(username, user_id)
+    db.add(
+        DBRefreshToken(
+            token_id=token_id,
+            user_id=user_id,
+            expires_at=expires_at,
+        )
+    )
+    return token, token_id
+
+async def revoke_token_family(db: AsyncSession, user_id: int, now: datetime) -> None:
+    await db.execute(
+        update(DBRefreshToken)
+        .where(
+            DBRefreshToken.user_id == user_id,
+            DBRefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=now)
+    )
+    await db.commit()
+
 @router.post("/register", status_code=201)
 async def register(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
@@ -24,12 +55,13 @@ async def register(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession
 
     user = DBUser(
         username=form.username,
-        password=hash_password(form.password)
+        password=await hash_password_async(form.password)
     )
     db.add(user)
     await db.commit()
+    invalidate_principal(form.username)
 
-    logger.info(f"New user registered: {form.username}")
+    logger.info("New user registered: %s", form.username)
 
     return {"message": "User registered successfully"}
 
@@ -40,7 +72,7 @@ async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
     )
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form.password, user.password):
+    if not user or not await verify_password_async(form.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
@@ -48,10 +80,93 @@ async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
         )
 
     token = create_access_token(user.username)
+    # Rows only matter until expiry (reuse detection); clear this user's stale ones on each login
+    await purge_expired_refresh_tokens(db, user.user_id)
+    refresh_token, _ = issue_refresh_token(db, user.username, user.user_id)
+    await db.commit()
 
-    logger.info(f"User logged in: {form.username}")
+    logger.info("User logged in: %s", form.username)
 
     return {
         "access_token": token,
+        "refresh_token": refresh_token,
         "token_type": "bearer"
     }
+
+@router.post("/token/refresh")
+async def refresh_access_token(request_body: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    payload = decode_refresh_token(request_body.refresh_token)
+
+    result = await db.execute(
+        select(DBRefreshToken).where(DBRefreshToken.token_id == payload["jti"])
+    )
+    stored_token = result.scalar_one_or_none()
+    now = datetime.now()
+
+    if not stored_token or stored_token.user_id != payload.get("uid"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+
+    if stored_token.revoked_at is not None:
+        # A rotated token was presented again: treat the whole token family as compromised
+        await revoke_token_family(db, stored_token.user_id, now)
+        logger.warning("Refresh token reuse detected for user: %s", payload['sub'])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token revoked",
+        )
+
+    if stored_token.expires_at <= now:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token expired",
+        )
+
+    refresh_token, token_id = issue_refresh_token(db, payload["sub"], stored_token.user_id)
+    # Revoke conditionally, so only one of two concurrent refreshes with this token wins
+    claimed = await db.execute(
+        update(DBRefreshToken)
+        .where(
+            DBRefreshToken.token_id == stored_token.token_id,
+            DBRefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=now, replaced_by=token_id)
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount == 0:
+        await db.rollback()
+        await revoke_token_family(db, stored_token.user_id, now)
+        logger.warning("Refresh token reuse detected for user: %s", payload['sub'])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token revoked",
+        )
+    await db.commit()
+
+    logger.info("Refreshed token for user: %s", payload['sub'])
+
+    return {
+        "access_token": create_access_token(payload["sub"]),
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+@router.post("/token/revoke")
+async def revoke_refresh_token(request_body: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    payload = decode_refresh_token(request_body.refresh_token)
+
+    await db.execute(
+        update(DBRefreshToken)
+        .where(
+            DBRefreshToken.token_id == payload["jti"],
+            DBRefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=datetime.now())
+    )
+    await db.commit()
+
+    logger.info("Revoked refresh token for user: %s", payload['sub'])
+
+    return {"message": "Refresh token revoked"}
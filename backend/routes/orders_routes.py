@@ -1,34 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+from fastapi import APIRouter, Depends, Header, Query, Response, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
+from typing import Literal, Optional
 
 from backend.utils import get_db
 from backend.utils.logger import AppLogger
 from backend.utils.auth import get_current_user
-from backend.models import Order, DBOrder, DBUser, DBProduct, DBInventory
-from backend.models.api_models import CreateOrderRequest
+from backend.utils.pagination import PageParams, apply_keyset, split_page
+from backend.utils.serialization import row_mode, entity_select, entity_rows, entity_row, dump_rows, json_response
+from backend.utils.fieldsets import select_fields
+from backend.utils.export import EXPORT_MEDIA_TYPES, stream_export
+from backend.utils.inventory import aggregate_quantities, increment_inventory, bump_inventory_version
+from backend.utils.catalog import fetch_products
+from backend.utils.line_items import insert_order_items
+from backend.utils.rollups import apply_order_rollups
+from backend.utils.idempotency import idempotency_store
+from backend.models import Order, Product, DBOrder, DBUser
+from backend.models.api_models import (
+    CreateOrderRequest,
+    CreateOrdersBatchRequest,
+    BatchEntryResult,
+    BatchResponse,
+)
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 logger = AppLogger.get_logger(__name__)
 
-async def enrich_order_items(db, order_items: list[dict]) -> list[dict]:
-    product_ids = {item["product_id"] for item in order_items}
-
-    result = await db.execute(
-        select(DBProduct).where(DBProduct.product_id.in_(product_ids))
-    )
-    products = result.scalars().all()
-
-    if len(products) != len(product_ids):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid product_id in order",
-        )
+BATCH_ENTRIES_PER_TRANSACTION = int(os.getenv("BATCH_ENTRIES_PER_TRANSACTION", "500"))
 
-    product_map = {
-        p.product_id: p.supplier_id for p in products
-    }
+def build_order_items(order_items: list[dict], product_map: dict[int, Product]) -> list[dict]:
+    if any(item["product_id"] not in product_map for item in order_items):
+        raise ValueError("Invalid product_id in order")
 
     enriched_items = []
     for item in order_items:
@@ -36,7 +41,7 @@ async def enrich_order_items(db, order_items: list[dict]) -> list[dict]:
         enriched_items.append(
             {
                 "product_id": item["product_id"],
-                "supplier_id": product_map[item["product_id"]],
+                "supplier_id": product_map[item["product_id"]].supplier_id,
                 "quantity": item["quantity"],
                 "unit_price": item["unit_price"],
                 "subtotal": subtotal,
@@ -45,35 +50,70 @@ async def enrich_order_items(db, order_items: list[dict]) -> list[dict]:
 
     return enriched_items
 
+async def enrich_order_items(db, order_items: list[dict]) -> list[dict]:
+    product_map = await fetch_products(db, {item["product_id"] for item in order_items})
+
+    try:
+        return build_order_items(order_items, product_map)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
 @router.get("")
 async def get_orders(
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBOrder)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
     logger.info("Retrieving orders list...")
-    sql_query = select(DBOrder)
-    result = await db.execute(sql_query)
-    orders = result.scalars().all()
+    sql_query = entity_select(DBOrder, fields)
+    result = await db.execute(apply_keyset(sql_query, [DBOrder.order_id], page))
+    orders, next_cursor = split_page(entity_rows(result, fields), page, lambda row: [row.order_id])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
-    logger.info(f"Retrieved {len(orders)} orders.")
+    logger.info("Retrieved %s orders.", len(orders))
+    if row_mode(fields):
+        return json_response(dump_rows(orders, Order, fields), response)
     return orders
 
+@router.get("/export")
+async def export_orders(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson: one order per line, csv: one line item per row"),
+    start: Optional[datetime] = Query(None, description="Only orders at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only orders before this time"),
+    current_user: DBUser = Depends(get_current_user),
+):
+    logger.info("Exporting orders as %s (start=%s, end=%s)...", export_format, start, end)
+    return StreamingResponse(
+        stream_export(DBOrder, DBOrder.order_id, DBOrder.order_details, export_format, start, end),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{export_format}"'},
+    )
+
 @router.get("/{order_id}")
 async def get_order_by_id(
     order_id: int,
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBOrder)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
-    logger.info(f"Retrieving order with ID {order_id}...")
-    sql_query = select(DBOrder).where(DBOrder.order_id == order_id)
+    logger.info("Retrieving order with ID %s...", order_id)
+    sql_query = entity_select(DBOrder, fields).where(DBOrder.order_id == order_id)
     result = await db.execute(sql_query)
-    order = result.scalar_one_or_none()
+    order = entity_row(result, fields)
 
     if order:
-        logger.info(f"Order with ID {order_id} retrieved successfully.")
+        logger.info("Order with ID %s retrieved successfully.", order_id)
+        if row_mode(fields):
+            return json_response(dump_rows([order], Order, fields)[0])
         return order
     else:
-        logger.warning(f"Order with ID {order_id} not found.")
+        logger.warning("Order with ID %s not found.", order_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found",
@@ -82,13 +122,22 @@ async def get_order_by_id(
 @router.post("")
 async def create_order(
     request_body: CreateOrderRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=200),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
     logger.info("Creating new order...")
+    if idempotency_key:
+        scoped_key = idempotency_store.scoped_key("orders", current_user.user_id, idempotency_key)
+        request_hash = idempotency_store.fingerprint(request_body.model_dump())
+        replay = await idempotency_store.lookup(db, scoped_key, request_hash)
+        if replay:
+            logger.info("Replaying stored response for idempotency key %s", idempotency_key)
+            return replay
+
     try:
         enriched_items = await enrich_order_items(db, request_body.order_items)
-        logger.info(f"Enriched order items.")
+        logger.info("Enriched order items.")
 
         total_amount = sum(item["subtotal"] for item in enriched_items)
 
@@ -100,36 +149,116 @@ async def create_order(
         db.add(order)
 
         await db.flush()
+        await insert_order_items(db, [order])
+        await apply_order_rollups(db, [order])
 
-        logger.info(f"Created order: {order.order_id}")
+        logger.info("Created order: %s", order.order_id)
 
-        for item in enriched_items:
-            result = await db.execute(
-                select(DBInventory).where(
-                    DBInventory.product_id == item["product_id"]
-                )
-            )
-            inventory = result.scalar_one_or_none()
-
-            if inventory:
-                inventory.quantity += item["quantity"]
-            else:
-                db.add(
-                    DBInventory(
-                        product_id=item["product_id"],
-                        quantity=item["quantity"],
-                    )
-                )
+        await increment_inventory(db, aggregate_quantities(enriched_items))
         logger.info("Updated inventory based on order items")
 
-        await db.commit()
+        if idempotency_key:
+            record = idempotency_store.stage(
+                db,
+                scoped_key,
+                request_hash,
+                status.HTTP_200_OK,
+                Order.model_validate(order).model_dump(mode="json"),
+            )
+
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            # A concurrent request with the same key committed first; hand back its response
+            replay = await idempotency_store.lookup(db, scoped_key, request_hash) if idempotency_key else None
+            if replay is None:
+                raise
+            return replay
+
+        await bump_inventory_version()
+        if idempotency_key:
+            idempotency_store.remember(scoped_key, record)
         await db.refresh(order)
 
         return order
-    
+
+    except HTTPException:
+        raise
+
     except Exception as e:
-        logger.error(f"Error creating order: {e}")
+        logger.error("Error creating order: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error while making order:\n{str(e)}",
-        )
\ No newline at end of file
+        )
+
+@router.post("/batch", response_model=BatchResponse)
+async def create_orders_batch(
+    request_body: CreateOrdersBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+):
+    logger.info("Creating batch of %s orders...", len(request_body.orders))
+    product_map = await fetch_products(
+        db,
+        {item.get("product_id") for entry in request_body.orders for item in entry.order_items},
+    )
+    results: list[BatchEntryResult] = []
+
+    for start in range(0, len(request_body.orders), BATCH_ENTRIES_PER_TRANSACTION):
+        chunk = request_body.orders[start:start + BATCH_ENTRIES_PER_TRANSACTION]
+
+        pending = []
+        for index, entry in enumerate(chunk, start=start):
+            try:
+                pending.append((index, build_order_items(entry.order_items, product_map)))
+            except (KeyError, TypeError, ValueError) as e:
+                results.append(BatchEntryResult(index=index, success=False, error=str(e)))
+
+        if not pending:
+            continue
+
+        try:
+            orders = [
+                DBOrder(
+                    order_details=enriched_items,
+                    total_amount=sum(item["subtotal"] for item in enriched_items),
+                    timestamp=datetime.now(),
+                )
+                for _, enriched_items in pending
+            ]
+            db.add_all(orders)
+            await db.flush()
+            await insert_order_items(db, orders)
+            await apply_order_rollups(db, orders)
+
+            await increment_inventory(
+                db,
+                aggregate_quantities([item for _, enriched_items in pending for item in enriched_items]),
+            )
+            await db.commit()
+            await bump_inventory_version()
+
+            results.extend(
+                BatchEntryResult(index=index, success=True, id=order.order_id)
+                for (index, _), order in zip(pending, orders)
+            )
+
+        except Exception as e:
+            await db.rollback()
+            logger.error("Error creating order batch starting at entry %s: %s", start, e)
+            results.extend(
+                BatchEntryResult(index=index, success=False, error=f"Transaction failed: {e}")
+                for index, _ in pending
+            )
+
+    results.sort(key=lambda entry: entry.index)
+    succeeded = sum(1 for entry in results if entry.success)
+    logger.info("Created %s of %s batched orders.", succeeded, len(results))
+
+    return BatchResponse(
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
\ No newline at end of file
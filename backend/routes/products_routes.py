@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, Response, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from typing import Optional
 
 from backend.utils import get_db
 from backend.utils.logger import AppLogger
 from backend.utils.auth import get_current_user
+from backend.utils.pagination import PageParams, apply_keyset, split_page
+from backend.utils.serialization import row_mode, entity_select, entity_rows, dump_rows, json_response
+from backend.utils.fieldsets import select_fields, parse_fields
+from backend.utils.product_search import ProductSearchParams, apply_product_search
+from backend.utils.catalog import catalog_cache, bump_table_version
+from backend.utils.etag import make_etag, etag_matches, not_modified, table_version
 from backend.models import Product, DBProduct, DBUser
 from backend.models.api_models import (
     GetProductsResponse,
@@ -18,41 +24,76 @@ logger = AppLogger.get_logger(__name__)
 
 @router.get("", response_model=GetProductsResponse)
 async def get_products(
+    request: Request,
+    response: Response,
     supplier_id: Optional[int] = Query(None, description="Filter by supplier ID"),
+    include_count: bool = Query(False, description="Also count all matching products (costs a full scan)"),
+    search: ProductSearchParams = Depends(),
+    page: PageParams = Depends(),
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBProduct)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ) -> GetProductsResponse:
     
     logger.info("Retrieving products list...")
-        
-    sql_query = select(DBProduct)
+
+    etag = make_etag("products", await table_version(db, "products"), sorted(request.query_params.multi_items()))
+    if etag_matches(request, etag):
+        logger.info("Products list not modified.")
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    selected = fields
+    if fields and search.sort_by not in fields:
+        # The cursor is built from the sort column, so it has to be fetched, but not returned
+        selected = parse_fields(",".join((*fields, search.sort_by)), DBProduct)
+
+    sql_query = entity_select(DBProduct, selected)
     if supplier_id is not None:
         sql_query = sql_query.where(DBProduct.supplier_id == supplier_id)
+    sql_query = apply_product_search(sql_query, search, db.get_bind().dialect.name)
+
+    key_columns = search.key_columns
+    result = await db.execute(apply_keyset(sql_query, key_columns, page, descending=search.descending))
+    products, next_cursor = split_page(
+        entity_rows(result, selected),
+        page,
+        lambda p: [getattr(p, column.key) for column in key_columns],
+    )
 
-    result = await db.execute(sql_query)
-    products = result.scalars().all()
+    count = None
+    if include_count:
+        count_result = await db.execute(select(func.count()).select_from(sql_query.subquery()))
+        count = count_result.scalar_one()
     
-    response = GetProductsResponse(
-        count=len(products),
-        products=products
+    logger.info("Retrieved %s products.", len(products))
+    if row_mode(fields):
+        return json_response(
+            {"count": count, "products": dump_rows(products, Product, fields), "next_cursor": next_cursor},
+            response,
+        )
+    return GetProductsResponse(
+        count=count,
+        products=products,
+        next_cursor=next_cursor,
     )
-    logger.info(f"Retrieved {len(products)} products.")
-    return response
 
 @router.get("/{product_id}")
 async def get_product_by_id(
     product_id: int,
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBProduct)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ) -> Product:
     
-    logger.info(f"Retrieving product with ID {product_id}...")
+    logger.info("Retrieving product with ID %s...", product_id)
     
-    sql_query = select(DBProduct).where(DBProduct.product_id == product_id)
-    result = await db.execute(sql_query)
-    product = result.scalar_one_or_none()
+    product = await catalog_cache.get_product(db, product_id)
     if product:
-        logger.info(f"Product with ID {product_id} retrieved successfully.")
+        logger.info("Product with ID %s retrieved successfully.", product_id)
+        if fields:
+            # Served from the catalog cache, so the projection happens on the snapshot
+            return json_response(product.model_dump(include=set(fields)))
         return product
     else:
         raise HTTPException(
@@ -76,7 +117,9 @@ async def create_product(
     
     try:
         db.add(db_product)
+        await bump_table_version(db, "products")
         await db.commit()
+        catalog_cache.invalidate("products")
         await db.refresh(db_product)
 
         logger.info("Product created successfully.")
@@ -84,7 +127,7 @@ async def create_product(
         return db_product
 
     except Exception as e:
-        logger.error(f"Error creating product: {e}")
+        logger.error("Error creating product: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
@@ -96,13 +139,13 @@ async def update_product(
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
-    logger.info(f"Updating product with ID {request_body.product_id}...")
+    logger.info("Updating product with ID %s...", request_body.product_id)
     sql_query = select(DBProduct).where(DBProduct.product_id == request_body.product_id)
     result = await db.execute(sql_query)
     db_product = result.scalar_one_or_none()
 
     if not db_product:
-        logger.warning(f"Product with ID {request_body.product_id} not found.")
+        logger.warning("Product with ID %s not found.", request_body.product_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found",
@@ -114,15 +157,17 @@ async def update_product(
         db_product.unit_price = request_body.unit_price
         db_product.supplier_id = request_body.supplier_id
 
+        await bump_table_version(db, "products")
         await db.commit()
+        catalog_cache.invalidate("products")
         await db.refresh(db_product)
 
-        logger.info(f"Product with ID {request_body.product_id} updated successfully.")
+        logger.info("Product with ID %s updated successfully.", request_body.product_id)
 
         return db_product
     
     except Exception as e:
-        logger.error(f"Error updating product with ID {request_body.product_id}: {e}")
+        logger.error("Error updating product with ID %s: %s", request_body.product_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
@@ -134,13 +179,13 @@ async def delete_product(
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
-    logger.info(f"Deleting product with ID {product_id}...")
+    logger.info("Deleting product with ID %s...", product_id)
     sql_query = select(DBProduct).where(DBProduct.product_id == product_id)
     result = await db.execute(sql_query)
     db_product = result.scalar_one_or_none()
 
     if not db_product:
-        logger.warning(f"Product with ID {product_id} not found.")
+        logger.warning("Product with ID %s not found.", product_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found",
@@ -148,14 +193,16 @@ async def delete_product(
     
     try:
         await db.delete(db_product)
+        await bump_table_version(db, "products")
         await db.commit()
+        catalog_cache.invalidate("products")
 
-        logger.info(f"Product with ID {product_id} deleted successfully.")
+        logger.info("Product with ID %s deleted successfully.", product_id)
 
         return {"message": "Product deleted successfully"}
     
     except Exception as e:
-        logger.error(f"Error deleting product with ID {product_id}: {e}")
+        logger.error("Error deleting product with ID %s: %s", product_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
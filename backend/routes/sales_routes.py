@@ -1,99 +1,161 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+import asyncio
+from fastapi import APIRouter, Depends, Header, Query, Response, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
+from typing import Literal, Optional
 
 from backend.utils import get_db
 from backend.utils.logger import AppLogger
 from backend.utils.auth import get_current_user
-from backend.models import Sale, DBSale, DBUser, DBProduct, DBInventory
-from backend.models.api_models import CreateSaleRequest
+from backend.utils.pagination import PageParams, apply_keyset, split_page
+from backend.utils.serialization import row_mode, entity_select, entity_rows, entity_row, dump_rows, json_response
+from backend.utils.fieldsets import select_fields
+from backend.utils.export import EXPORT_MEDIA_TYPES, stream_export
+from backend.utils.inventory import (
+    InsufficientInventoryError,
+    aggregate_quantities,
+    find_short_items,
+    reserve_inventory,
+    bump_inventory_version,
+)
+from backend.utils.catalog import fetch_products
+from backend.utils.line_items import insert_sale_items
+from backend.utils.rollups import apply_sales_rollups
+from backend.utils.sale_recorder import record_sales, sale_writer
+from backend.utils.idempotency import idempotency_store
+from backend.models import Sale, Product, DBSale, DBUser, DBInventory, DBIdempotencyKey
+from backend.models.api_models import (
+    CreateSaleRequest,
+    CreateSalesBatchRequest,
+    BatchEntryResult,
+    BatchResponse,
+)
 
 router = APIRouter(prefix="/sales", tags=["Sales"])
 logger = AppLogger.get_logger(__name__)
 
-async def enrich_sale_items(db, sale_items: list[dict]) -> list[dict]:
-    product_ids = {item["product_id"] for item in sale_items}
-
-    result = await db.execute(
-        select(DBProduct).where(DBProduct.product_id.in_(product_ids))
-    )
-    products = result.scalars().all()
-
-    if len(products) != len(product_ids):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid product_id in sale",
-        )
+BATCH_ENTRIES_PER_TRANSACTION = int(os.getenv("BATCH_ENTRIES_PER_TRANSACTION", "500"))
 
-    product_map = {
-        p.product_id: {
-            "supplier_id": p.supplier_id,
-            "unit_price": p.unit_price,
-        }
-        for p in products
-    }
+def build_sale_items(sale_items: list[dict], product_map: dict[int, Product]) -> list[dict]:
+    if any(item["product_id"] not in product_map for item in sale_items):
+        raise ValueError("Invalid product_id in sale")
 
     enriched = []
     for item in sale_items:
-        unit_price = product_map[item["product_id"]]["unit_price"]
-        subtotal = unit_price * item["quantity"]
+        product = product_map[item["product_id"]]
+        subtotal = product.unit_price * item["quantity"]
 
         enriched.append(
             {
                 "product_id": item["product_id"],
-                "supplier_id": product_map[item["product_id"]]["supplier_id"],
+                "supplier_id": product.supplier_id,
                 "quantity": item["quantity"],
-                "unit_price": unit_price,
+                "unit_price": product.unit_price,
                 "subtotal": subtotal,
             }
         )
 
     return enriched
 
-async def inventory_is_sufficient(db, enriched_items: list[dict]) -> bool:
-    for item in enriched_items:
-        result = await db.execute(
-            select(DBInventory).where(
-                DBInventory.product_id == item["product_id"]
-            )
+async def enrich_sale_items(db, sale_items: list[dict]) -> list[dict]:
+    product_map = await fetch_products(db, {item["product_id"] for item in sale_items})
+
+    try:
+        return build_sale_items(sale_items, product_map)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
         )
-        inventory = result.scalar_one_or_none()
 
-        if not inventory or inventory.quantity < item["quantity"]:
-            return False
+async def inventory_is_sufficient(db, enriched_items: list[dict]) -> bool:
+    quantities = aggregate_quantities(enriched_items)
+    result = await db.execute(
+        select(DBInventory.product_id, DBInventory.quantity).where(
+            DBInventory.product_id.in_(quantities)
+        )
+    )
+    available = {product_id: quantity for product_id, quantity in result.all()}
 
-    return True
+    return not find_short_items(available, quantities)
 
 @router.get("")
 async def get_sales(
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBSale)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
     logger.info("Retrieving sales list...")
-    sql_query = select(DBSale)
-    result = await db.execute(sql_query)
-    sales = result.scalars().all()
+    sql_query = entity_select(DBSale, fields)
+    result = await db.execute(apply_keyset(sql_query, [DBSale.sale_id], page))
+    sales, next_cursor = split_page(entity_rows(result, fields), page, lambda row: [row.sale_id])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
-    logger.info(f"Retrieved {len(sales)} sales.")
+    logger.info("Retrieved %s sales.", len(sales))
+    if row_mode(fields):
+        return json_response(dump_rows(sales, Sale, fields), response)
     return sales
 
+@router.get("/export")
+async def export_sales(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson: one sale per line, csv: one line item per row"),
+    start: Optional[datetime] = Query(None, description="Only sales at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only sales before this time"),
+    current_user: DBUser = Depends(get_current_user),
+):
+    logger.info("Exporting sales as %s (start=%s, end=%s)...", export_format, start, end)
+    return StreamingResponse(
+        stream_export(DBSale, DBSale.sale_id, DBSale.sale_details, export_format, start, end),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="sales.{export_format}"'},
+    )
+
+@router.get("/pending/{handle}")
+async def get_pending_sale(
+    handle: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+):
+    """Status of a sale queued with `async_mode=true`: queued, committed (with its sale_id) or failed.
+
+    Outcomes are kept for SALES_HANDLE_TTL_SECONDS and can be polled from any worker; until
+    its group commit (a few milliseconds), a queued handle is only known to the worker that accepted it.
+    """
+
+    sale_status = await sale_writer.lookup(db, handle)
+    if not sale_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sale handle not found",
+        )
+    return sale_status
+
 @router.get("/{sale_id}")
 async def get_sale_by_id(
     sale_id: int,
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBSale)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
-    logger.info(f"Retrieving sale with ID {sale_id}...")
-    sql_query = select(DBSale).where(DBSale.sale_id == sale_id)
+    logger.info("Retrieving sale with ID %s...", sale_id)
+    sql_query = entity_select(DBSale, fields).where(DBSale.sale_id == sale_id)
     result = await db.execute(sql_query)
-    sale = result.scalar_one_or_none()
+    sale = entity_row(result, fields)
 
     if sale:
-        logger.info(f"Sale with ID {sale_id} retrieved successfully.")
+        logger.info("Sale with ID %s retrieved successfully.", sale_id)
+        if row_mode(fields):
+            return json_response(dump_rows([sale], Sale, fields)[0])
         return sale
     else:
-        logger.warning(f"Sale with ID {sale_id} not found.")
+        logger.warning("Sale with ID %s not found.", sale_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Sale not found",
@@ -102,18 +164,93 @@ async def get_sale_by_id(
 @router.post("")
 async def create_sale(
     request_body: CreateSaleRequest,
+    response: Response,
+    async_mode: bool = Query(False, description="Queue the sale for a group commit and return a handle (202); 503 when write-behind is not enabled"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=200),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
     logger.info("Creating new sale...")
+    if idempotency_key:
+        scoped_key = idempotency_store.scoped_key("sales", current_user.user_id, idempotency_key)
+        request_hash = idempotency_store.fingerprint(request_body.model_dump())
+        replay = await idempotency_store.lookup(db, scoped_key, request_hash)
+        if replay:
+            logger.info("Replaying stored response for idempotency key %s", idempotency_key)
+            return replay
+
     try:
         enriched_items = await enrich_sale_items(db, request_body.sale_items)
 
-        if not await inventory_is_sufficient(db, enriched_items):
-            logger.warning("Insufficient inventory for sale")
+        if async_mode and not sale_writer.running:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Async sales are not available on this server; retry without async_mode",
+            )
+
+        if async_mode:
+            handle = sale_writer.new_handle()
+            if idempotency_key:
+                # Claim the key before queueing so a concurrent retry cannot queue the sale twice
+                record = idempotency_store.stage(
+                    db,
+                    scoped_key,
+                    request_hash,
+                    status.HTTP_202_ACCEPTED,
+                    {"handle": handle, "status": "queued"},
+                )
+                try:
+                    await db.commit()
+                except IntegrityError:
+                    await db.rollback()
+                    replay = await idempotency_store.lookup(db, scoped_key, request_hash)
+                    if replay is None:
+                        # The other request's claim was released before we could read it
+                        raise HTTPException(
+                            status_code=status.HTTP_409_CONFLICT,
+                            detail="A request with this Idempotency-Key is still being processed",
+                            headers={"Retry-After": "1"},
+                        )
+                    return replay
+
+            try:
+                await sale_writer.submit(db, enriched_items, handle)
+            except Exception as e:
+                # Release the claim whatever went wrong, so a retry is not answered with a phantom handle
+                if idempotency_key:
+                    await db.rollback()
+                    await db.execute(delete(DBIdempotencyKey).where(DBIdempotencyKey.idempotency_key == scoped_key))
+                    await db.commit()
+                if not isinstance(e, (InsufficientInventoryError, asyncio.QueueFull)):
+                    raise
+                if isinstance(e, asyncio.QueueFull):
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail="Sale queue is full, retry shortly",
+                        headers={"Retry-After": "1"},
+                    )
+                logger.warning("Insufficient inventory for sale: %s", e.short_items)
+                return {
+                    "message": "Insufficient inventory",
+                    "short_items": e.short_items,
+                }
+
+            if idempotency_key:
+                idempotency_store.remember(scoped_key, record)
+            logger.info("Queued sale: %s", handle)
+            response.status_code = status.HTTP_202_ACCEPTED
+            return sale_writer.get_status(handle)
+
+        try:
+            await reserve_inventory(db, aggregate_quantities(enriched_items))
+        except InsufficientInventoryError as e:
+            await db.rollback()
+            logger.warning("Insufficient inventory for sale: %s", e.short_items)
             return {
                 "message": "Insufficient inventory",
+                "short_items": e.short_items,
             }
+        logger.info("Reserved inventory for sale items")
 
         total_amount = sum(item["subtotal"] for item in enriched_items)
 
@@ -125,28 +262,107 @@ async def create_sale(
         db.add(sale)
 
         await db.flush()
+        await insert_sale_items(db, [sale])
+        await apply_sales_rollups(db, [sale])
 
-        logger.info(f"Created sale: {sale.sale_id}")
+        logger.info("Created sale: %s", sale.sale_id)
 
-        for item in enriched_items:
-            result = await db.execute(
-                select(DBInventory).where(
-                    DBInventory.product_id == item["product_id"]
-                )
+        if idempotency_key:
+            record = idempotency_store.stage(
+                db,
+                scoped_key,
+                request_hash,
+                status.HTTP_200_OK,
+                Sale.model_validate(sale).model_dump(mode="json"),
             )
-            inventory = result.scalar_one()
 
-            inventory.quantity -= item["quantity"]
-        logger.info("Updated inventory based on sale items")
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            # A concurrent request with the same key committed first; hand back its response
+            replay = await idempotency_store.lookup(db, scoped_key, request_hash) if idempotency_key else None
+            if replay is None:
+                raise
+            return replay
 
-        await db.commit()
+        await bump_inventory_version()
+        if idempotency_key:
+            idempotency_store.remember(scoped_key, record)
         await db.refresh(sale)
 
         return sale
-    
+
+    except HTTPException:
+        raise
+
     except Exception as e:
-        logger.error(f"Error creating sale: {e}")
+        logger.error("Error creating sale: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error while making sale:\n{str(e)}",
-        )
\ No newline at end of file
+        )
+
+@router.post("/batch", response_model=BatchResponse)
+async def create_sales_batch(
+    request_body: CreateSalesBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+):
+    logger.info("Creating batch of %s sales...", len(request_body.sales))
+    product_map = await fetch_products(
+        db,
+        {item.get("product_id") for entry in request_body.sales for item in entry.sale_items},
+    )
+    results: list[BatchEntryResult] = []
+
+    for start in range(0, len(request_body.sales), BATCH_ENTRIES_PER_TRANSACTION):
+        chunk = request_body.sales[start:start + BATCH_ENTRIES_PER_TRANSACTION]
+
+        enriched_entries = []
+        for index, entry in enumerate(chunk, start=start):
+            try:
+                enriched_entries.append((index, build_sale_items(entry.sale_items, product_map)))
+            except (KeyError, TypeError, ValueError) as e:
+                results.append(BatchEntryResult(index=index, success=False, error=str(e)))
+
+        if not enriched_entries:
+            continue
+
+        try:
+            sales, shortages = await record_sales(db, enriched_entries)
+            await db.commit()
+            if sales:
+                await bump_inventory_version()
+
+            results.extend(
+                BatchEntryResult(index=index, success=True, id=sale.sale_id)
+                for index, sale in sales.items()
+            )
+            results.extend(
+                BatchEntryResult(
+                    index=index,
+                    success=False,
+                    error="Insufficient inventory",
+                    short_items=short_items,
+                )
+                for index, short_items in shortages.items()
+            )
+
+        except Exception as e:
+            await db.rollback()
+            logger.error("Error creating sale batch starting at entry %s: %s", start, e)
+            results.extend(
+                BatchEntryResult(index=index, success=False, error=f"Transaction failed: {e}")
+                for index, _ in enriched_entries
+            )
+
+    results.sort(key=lambda entry: entry.index)
+    succeeded = sum(1 for entry in results if entry.success)
+    logger.info("Created %s of %s batched sales.", succeeded, len(results))
+
+    return BatchResponse(
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
\ No newline at end of file
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, Response, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from typing import Optional
 
 from backend.utils import get_db
 from backend.utils.logger import AppLogger
 from backend.utils.auth import get_current_user
+from backend.utils.pagination import PageParams, apply_keyset, split_page
+from backend.utils.serialization import row_mode, entity_select, entity_rows, dump_rows, json_response
+from backend.utils.fieldsets import select_fields
+from backend.utils.catalog import catalog_cache, bump_table_version
+from backend.utils.etag import make_etag, etag_matches, not_modified, table_version
 from backend.models import Supplier, DBSupplier, DBUser
 from backend.models.api_models import (
     GetSuppliersResponse,
@@ -18,40 +23,64 @@ logger = AppLogger.get_logger(__name__)
 
 @router.get("", response_model=GetSuppliersResponse)
 async def get_suppliers(
+    request: Request,
+    response: Response,
     location: Optional[str] = Query(None, description="Filter by location"),
+    include_count: bool = Query(False, description="Also count all matching suppliers (costs a full scan)"),
+    page: PageParams = Depends(),
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBSupplier)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
     logger.info("Retrieving suppliers list...")
-    sql_query = select(DBSupplier)
+
+    etag = make_etag("suppliers", await table_version(db, "suppliers"), sorted(request.query_params.multi_items()))
+    if etag_matches(request, etag):
+        logger.info("Suppliers list not modified.")
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    sql_query = entity_select(DBSupplier, fields)
     if location is not None:
         sql_query = sql_query.where(DBSupplier.location == location)
 
-    result = await db.execute(sql_query)
-    suppliers = result.scalars().all()
+    result = await db.execute(apply_keyset(sql_query, [DBSupplier.supplier_id], page))
+    suppliers, next_cursor = split_page(entity_rows(result, fields), page, lambda s: [s.supplier_id])
+
+    count = None
+    if include_count:
+        count_result = await db.execute(select(func.count()).select_from(sql_query.subquery()))
+        count = count_result.scalar_one()
     
-    response = GetSuppliersResponse(
-        count=len(suppliers),
-        suppliers=suppliers
+    logger.info("Retrieved %s suppliers.", len(suppliers))
+    if row_mode(fields):
+        return json_response(
+            {"count": count, "suppliers": dump_rows(suppliers, Supplier, fields), "next_cursor": next_cursor},
+            response,
+        )
+    return GetSuppliersResponse(
+        count=count,
+        suppliers=suppliers,
+        next_cursor=next_cursor,
     )
-    logger.info(f"Retrieved {len(suppliers)} suppliers.")
-    return response
 
 @router.get("/{supplier_id}")
 async def get_supplier_by_id(
     supplier_id: int,
+    fields: Optional[tuple[str, ...]] = Depends(select_fields(DBSupplier)),
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
-    logger.info(f"Retrieving supplier with ID {supplier_id}...")
-    sql_query = select(DBSupplier).where(DBSupplier.supplier_id == supplier_id)
-    result = await db.execute(sql_query)
-    supplier = result.scalar_one_or_none()
+    logger.info("Retrieving supplier with ID %s...", supplier_id)
+    supplier = await catalog_cache.get_supplier(db, supplier_id)
     if supplier:
-        logger.info(f"Supplier with ID {supplier_id} retrieved successfully.")
+        logger.info("Supplier with ID %s retrieved successfully.", supplier_id)
+        if fields:
+            # Served from the catalog cache, so the projection happens on the snapshot
+            return json_response(supplier.model_dump(include=set(fields)))
         return supplier
     else:
-        logger.warning(f"Supplier with ID {supplier_id} not found.")
+        logger.warning("Supplier with ID %s not found.", supplier_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Supplier not found",
@@ -73,14 +102,16 @@ async def create_supplier(
     
     try:
         db.add(db_supplier)
+        await bump_table_version(db, "suppliers")
         await db.commit()
+        catalog_cache.invalidate("suppliers")
         await db.refresh(db_supplier)
 
         logger.info("Supplier created successfully.")
         return db_supplier
 
     except Exception as e:
-        logger.error(f"Error creating supplier: {e}")
+        logger.error("Error creating supplier: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
@@ -92,13 +123,13 @@ async def update_supplier(
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
-    logger.info(f"Updating supplier with ID {request_body.supplier_id}...")
+    logger.info("Updating supplier with ID %s...", request_body.supplier_id)
     sql_query = select(DBSupplier).where(DBSupplier.supplier_id == request_body.supplier_id)
     result = await db.execute(sql_query)
     db_supplier = result.scalar_one_or_none()
 
     if not db_supplier:
-        logger.warning(f"Supplier with ID {request_body.supplier_id} not found.")
+        logger.warning("Supplier with ID %s not found.", request_body.supplier_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Supplier not found",
@@ -110,14 +141,16 @@ async def update_supplier(
         db_supplier.contact_email = request_body.contact_email
         db_supplier.reliability_score = request_body.reliability_score
 
+        await bump_table_version(db, "suppliers")
         await db.commit()
+        catalog_cache.invalidate("suppliers")
         await db.refresh(db_supplier)
 
-        logger.info(f"Supplier with ID {request_body.supplier_id} updated successfully.")
+        logger.info("Supplier with ID %s updated successfully.", request_body.supplier_id)
         return db_supplier
     
     except Exception as e:
-        logger.error(f"Error updating supplier with ID {request_body.supplier_id}: {e}")
+        logger.error("Error updating supplier with ID %s: %s", request_body.supplier_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
@@ -129,13 +162,13 @@ async def delete_supplier(
     db: AsyncSession = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
 ):
-    logger.info(f"Deleting supplier with ID {supplier_id}...")
+    logger.info("Deleting supplier with ID %s...", supplier_id)
     sql_query = select(DBSupplier).where(DBSupplier.supplier_id == supplier_id)
     result = await db.execute(sql_query)
     db_supplier = result.scalar_one_or_none()
 
     if not db_supplier:
-        logger.warning(f"Supplier with ID {supplier_id} not found.")
+        logger.warning("Supplier with ID %s not found.", supplier_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Supplier not found",
@@ -143,13 +176,15 @@ async def delete_supplier(
     
     try:
         await db.delete(db_supplier)
+        await bump_table_version(db, "suppliers")
         await db.commit()
+        catalog_cache.invalidate("suppliers")
 
-        logger.info(f"Supplier with ID {supplier_id} deleted successfully.")
+        logger.info("Supplier with ID %s deleted successfully.", supplier_id)
         return {"message": "Supplier deleted successfully"}
     
     except Exception as e:
-        logger.error(f"Error deleting supplier with ID {supplier_id}: {e}")
+        logger.error("Error deleting supplier with ID %s: %s", supplier_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
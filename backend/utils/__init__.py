@@ -1,15 +1,15 @@
-from .database import Base, engine, AsyncSessionLocal, get_db, create_tables, close_db
+from .database import Base, engine, AsyncSessionLocal, get_db, close_db
 from .seed_data import seed_database
 from .constants import SEED_SUPPLIERS_DATA, SEED_PRODUCTS_DATA, SEED_INVENTORY_DATA
 from .logger import AppLogger
-from .auth import hash_password, verify_password, create_access_token, get_current_user
+from .auth import hash_password, verify_password, create_access_token, get_current_user, invalidate_principal
+from .password_executor import password_executor, hash_password_async, verify_password_async
 
 __all__ = [
     "Base",
     "engine",
     "AsyncSessionLocal",
     "get_db",
-    "create_tables",
     "close_db",
     "seed_database",
     "SEED_SUPPLIERS_DATA",
@@ -20,4 +20,8 @@ __all__ = [
     "verify_password",
     "create_access_token",
     "get_current_user",
+    "invalidate_principal",
+    "password_executor",
+    "hash_password_async",
+    "verify_password_async",
 ]
\ No newline at end of file
@@ -1,14 +1,17 @@
 import os
 import jwt
+import uuid
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete
+from typing import Optional
 
 from backend.utils import get_db
-from backend.models import DBUser
+from backend.utils.cache import TTLCache
+from backend.models import DBUser, DBRefreshToken
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +19,12 @@ load_dotenv()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{os.getenv("API_BASE_PREFIX")}/login")
 
+# Authenticated principals keyed by token subject, so protected routes skip the users lookup
+principal_cache = TTLCache(
+    max_size=int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000")),
+    ttl_seconds=float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60")),
+)
+
 def hash_password(password: str) -> str:
     if password.startswith("$2"):
         raise RuntimeError("BUG: attempted to hash an already-hashed password")
@@ -27,24 +36,73 @@ def verify_password(plain: str, hashed: str) -> bool:
 def create_access_token(username: str) -> str:
     payload = {
         "sub": username,
+        "type": "access",
         "exp": datetime.now() + timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")))
     }
     return jwt.encode(payload, os.getenv("SECRET_KEY"), algorithm=os.getenv("JWT_ENCODE_ALGORITHM"))
 
+def create_refresh_token(username: str, user_id: int) -> tuple[str, str, datetime]:
+    token_id = uuid.uuid4().hex
+    expires_at = datetime.now() + timedelta(days=int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14")))
+    payload = {
+        "sub": username,
+        "uid": user_id,
+        "jti": token_id,
+        "type": "refresh",
+        "exp": expires_at,
+    }
+    token = jwt.encode(payload, os.getenv("SECRET_KEY"), algorithm=os.getenv("JWT_ENCODE_ALGORITHM"))
+    return token, token_id, expires_at
+
+def decode_refresh_token(token: str) -> dict:
+    try:
+        payload = jwt.decode(token, os.getenv("SECRET_KEY"), algorithms=[os.getenv("JWT_ENCODE_ALGORITHM")])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token expired")
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("sub"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    return payload
+
+async def purge_expired_refresh_tokens(db: AsyncSession, user_id: Optional[int] = None) -> int:
+    """Delete expired refresh token rows (for one user, or all); the caller commits."""
+
+    sql_query = delete(DBRefreshToken).where(DBRefreshToken.expires_at <= datetime.now())
+    if user_id is not None:
+        sql_query = sql_query.where(DBRefreshToken.user_id == user_id)
+    result = await db.execute(sql_query)
+    return result.rowcount
+
+def invalidate_principal(username: str) -> None:
+    principal_cache.pop(username)
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> DBUser:
     try:
         payload = jwt.decode(token, os.getenv("SECRET_KEY"), algorithms=[os.getenv("JWT_ENCODE_ALGORITHM")])
         username: str | None = payload.get("sub")
-        if not username:
+        if not username or payload.get("type") == "refresh":
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user")
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
     except jwt.PyJWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    result = await db.execute(select(DBUser).where(DBUser.username == username))
-    user = result.scalar_one_or_none()
+    principal = principal_cache.get(username)
+    if principal is None:
+        result = await db.execute(select(DBUser).where(DBUser.username == username))
+        user = result.scalar_one_or_none()
+
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+        principal = {
+            "user_id": user.user_id,
+            "username": user.username,
+            "password": user.password,
+        }
+        principal_cache.set(username, principal)
 
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
\ No newline at end of file
+    # Detached copy, so a cached principal is never bound to another request's session
+    return DBUser(**principal)
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+import time
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from backend.models import Product, Supplier, DBProduct, DBSupplier, DBTableVersion
+from backend.utils.cache import TTLCache
+from backend.utils.upsert import upsert_increment
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CATALOG_TABLES = ("products", "suppliers")
+
+async def bump_table_version(db: AsyncSession, table_name: str) -> None:
+    """Record a write to `table_name` in the caller's transaction so other workers drop their cached copies."""
+
+    await upsert_increment(
+        db,
+        DBTableVersion.__table__,
+        [{"table_name": table_name, "version": 1}],
+        key_columns=["table_name"],
+        increment_columns=["version"],
+    )
+
+class CatalogCache:
+    """Read-through cache of product and supplier snapshots.
+
+    Each worker polls table_versions at most every `poll_interval` seconds and drops a
+    table's entries when its version has moved, so a warm lookup issues no queries.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, poll_interval: float):
+        self.poll_interval = poll_interval
+        self._caches = {
+            "products": TTLCache(max_size=max_size, ttl_seconds=ttl_seconds),
+            "suppliers": TTLCache(max_size=max_size, ttl_seconds=ttl_seconds),
+        }
+        self._versions: dict[str, int] = {}
+        self._generations = {table: 0 for table in CATALOG_TABLES}
+        self._checked_at: float = float("-inf")
+
+    def invalidate(self, table_name: str) -> None:
+        self._caches[table_name].clear()
+        self._generations[table_name] += 1
+
+    async def _sync_versions(self, db: AsyncSession) -> None:
+        if time.monotonic() - self._checked_at < self.poll_interval:
+            return
+
+        result = await db.execute(
+            select(DBTableVersion.table_name, DBTableVersion.version).where(
+                DBTableVersion.table_name.in_(CATALOG_TABLES)
+            )
+        )
+        versions = {table_name: version for table_name, version in result.all()}
+        self._checked_at = time.monotonic()
+
+        for table_name in CATALOG_TABLES:
+            if versions.get(table_name, 0) != self._versions.get(table_name, 0):
+                self.invalidate(table_name)
+        self._versions = versions
+
+    async def _get_many(self, db: AsyncSession, table_name: str, model, db_model, key_column, keys) -> dict:
+        await self._sync_versions(db)
+        cache = self._caches[table_name]
+
+        found = {}
+        missing = []
+        for key in keys:
+            if key is None:
+                continue
+            snapshot = cache.get(key)
+            if snapshot is None:
+                missing.append(key)
+            else:
+                found[key] = snapshot
+
+        if missing:
+            generation = self._generations[table_name]
+            result = await db.execute(select(db_model).where(key_column.in_(missing)))
+            for row in result.scalars().all():
+                snapshot = model.model_validate(row)
+                found[getattr(row, key_column.key)] = snapshot
+                # Skip caching if an invalidation landed while the query was in flight
+                if generation == self._generations[table_name]:
+                    cache.set(getattr(row, key_column.key), snapshot)
+
+        return found
+
+    async def get_products(self, db: AsyncSession, product_ids) -> dict[int, Product]:
+        return await self._get_many(db, "products", Product, DBProduct, DBProduct.product_id, product_ids)
+
+    async def get_product(self, db: AsyncSession, product_id: int) -> Optional[Product]:
+        return (await self.get_products(db, [product_id])).get(product_id)
+
+    async def get_suppliers(self, db: AsyncSession, supplier_ids) -> dict[int, Supplier]:
+        return await self._get_many(db, "suppliers", Supplier, DBSupplier, DBSupplier.supplier_id, supplier_ids)
+
+    async def get_supplier(self, db: AsyncSession, supplier_id: int) -> Optional[Supplier]:
+        return (await self.get_suppliers(db, [supplier_id])).get(supplier_id)
+
+catalog_cache = CatalogCache(
+    max_size=int(os.getenv("CATALOG_CACHE_MAX_SIZE", "100000")),
+    ttl_seconds=float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "3600")),
+    poll_interval=float(os.getenv("CATALOG_VERSION_POLL_SECONDS", "2")),
+)
+
+async def fetch_products(db: AsyncSession, product_ids) -> dict[int, Product]:
+    return await catalog_cache.get_products(db, product_ids)
@@ -1,4 +1,7 @@
 import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from dotenv import load_dotenv
@@ -7,14 +10,46 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+def queue_pool_class() -> type:
+    if os.getenv("METRICS_ENABLED", "true").lower() == "true":
+        # Only pay for checkout timing when it is exported
+        from backend.utils.metrics import InstrumentedAsyncQueuePool
+        return InstrumentedAsyncQueuePool
+    return AsyncAdaptedQueuePool
+
+def engine_options(database_url: str) -> dict:
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return {
+            "poolclass": queue_pool_class(),
+            "pool_pre_ping": True,
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        }
+
+    if url.database in (None, "", ":memory:"):
+        # Every session has to share the one connection that holds the in-memory database,
+        # so this suits single-session use (scripts, tests) rather than concurrent traffic
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+    return {"poolclass": queue_pool_class()}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 engine = create_async_engine(
     DATABASE_URL,
     # echo=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    **engine_options(DATABASE_URL),
 )
 
+if engine.dialect.name == "sqlite":
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -32,11 +67,5 @@ async def get_db():
         finally:
             await session.close()
 
-async def create_tables():
-    from backend import models
-    
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
 async def close_db():
     await engine.dispose()
\ No newline at end of file
@@ -0,0 +1,29 @@
+import json
+import hashlib
+from typing import Any
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from backend.models import DBTableVersion
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+async def table_version(db: AsyncSession, table_name: str) -> int:
+    result = await db.execute(
+        select(DBTableVersion.version).where(DBTableVersion.table_name == table_name)
+    )
+    return result.scalar_one_or_none() or 0
@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from sqlalchemy import select
+
+from backend.utils.database import AsyncSessionLocal
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+CSV_COLUMNS = ("product_id", "supplier_id", "quantity", "unit_price", "subtotal")
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+async def stream_export(
+    model,
+    key_column,
+    details_column,
+    export_format: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[str]:
+    """Yield `model` rows as NDJSON (one header per line) or CSV (one line item per row).
+
+    Runs on its own session with a server-side cursor, so memory stays bounded by
+    `batch_size` no matter how many rows are exported.
+    """
+
+    key_name = key_column.key
+    details_name = details_column.key
+    columns = [key_column, model.timestamp, model.total_amount, details_column]
+
+    sql_query = select(*columns).order_by(key_column).execution_options(yield_per=batch_size)
+    if start is not None:
+        sql_query = sql_query.where(model.timestamp >= start)
+    if end is not None:
+        sql_query = sql_query.where(model.timestamp < end)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        writer.writerow((key_name, "timestamp", "total_amount", *CSV_COLUMNS))
+        yield buffer.getvalue()
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(sql_query)
+        async for partition in result.mappings().partitions(batch_size):
+            buffer.seek(0)
+            buffer.truncate()
+
+            for row in partition:
+                if export_format == "csv":
+                    for item in row[details_name]:
+                        writer.writerow((
+                            row[key_name],
+                            row["timestamp"].isoformat() if row["timestamp"] else "",
+                            row["total_amount"],
+                            *(item.get(column) for column in CSV_COLUMNS),
+                        ))
+                else:
+                    buffer.write(json.dumps(dict(row), default=_json_default))
+                    buffer.write("\n")
+
+            yield buffer.getvalue()
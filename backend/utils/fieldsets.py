@@ -0,0 +1,42 @@
+from functools import lru_cache
+from typing import Callable, Optional
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+def parse_fields(fields: Optional[str], model) -> Optional[tuple[str, ...]]:
+    """Validate a comma-separated column list against `model`; the primary key is always included."""
+
+    if not fields:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    columns = model.__table__.columns
+    unknown = sorted(requested - set(columns.keys()))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+
+    requested.update(column.name for column in model.__table__.primary_key)
+    return tuple(name for name in columns.keys() if name in requested)
+
+def select_fields(model) -> Callable[..., Optional[tuple[str, ...]]]:
+    def dependency(
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return; the ID is always included"),
+    ) -> Optional[tuple[str, ...]]:
+        return parse_fields(fields, model)
+
+    return dependency
+
+@lru_cache(maxsize=None)
+def partial_model(data_model: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(
+        f"{data_model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (data_model.model_fields[name].annotation, data_model.model_fields[name]) for name in fields},
+    )
+
+@lru_cache(maxsize=None)
+def partial_list_adapter(data_model: type[BaseModel], fields: tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(list[partial_model(data_model, fields)])
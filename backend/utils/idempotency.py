@@ -0,0 +1,101 @@
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+
+from backend.models import DBIdempotencyKey
+from backend.utils.cache import TTLCache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class IdempotencyStore:
+    """First responses for Idempotency-Key requests: an in-process LRU in front of the idempotency_keys table."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def scoped_key(scope: str, user_id: int, key: str) -> str:
+        return f"{scope}:{user_id}:{key}"
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def replay(record: dict) -> JSONResponse:
+        return JSONResponse(
+            content=record["response_body"],
+            status_code=record["status_code"],
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    async def lookup(self, db: AsyncSession, scoped_key: str, request_hash: str) -> Optional[JSONResponse]:
+        record = self.cache.get(scoped_key)
+
+        if record is None:
+            result = await db.execute(
+                select(DBIdempotencyKey).where(DBIdempotencyKey.idempotency_key == scoped_key)
+            )
+            stored = result.scalar_one_or_none()
+            if stored is None:
+                return None
+
+            if stored.expires_at <= datetime.now():
+                await db.delete(stored)
+                await db.commit()
+                return None
+
+            record = {
+                "request_hash": stored.request_hash,
+                "status_code": stored.status_code,
+                "response_body": stored.response_body,
+            }
+            self.cache.set(scoped_key, record, ttl_seconds=(stored.expires_at - datetime.now()).total_seconds())
+
+        if record["request_hash"] != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="Idempotency-Key was already used with a different request body",
+            )
+        return self.replay(record)
+
+    def stage(self, db: AsyncSession, scoped_key: str, request_hash: str, status_code: int, response_body: Any) -> dict:
+        """Add the record to the caller's transaction; call `remember` once it has committed."""
+
+        db.add(
+            DBIdempotencyKey(
+                idempotency_key=scoped_key,
+                request_hash=request_hash,
+                status_code=status_code,
+                response_body=response_body,
+                expires_at=datetime.now() + timedelta(seconds=self.ttl_seconds),
+            )
+        )
+        return {
+            "request_hash": request_hash,
+            "status_code": status_code,
+            "response_body": response_body,
+        }
+
+    def remember(self, scoped_key: str, record: dict) -> None:
+        self.cache.set(scoped_key, record)
+
+    async def purge_expired(self, db: AsyncSession) -> int:
+        result = await db.execute(
+            delete(DBIdempotencyKey).where(DBIdempotencyKey.expires_at <= datetime.now())
+        )
+        await db.commit()
+        return result.rowcount
+
+idempotency_store = IdempotencyStore(
+    max_size=int(os.getenv("IDEMPOTENCY_CACHE_MAX_SIZE", "10000")),
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400")),
+)
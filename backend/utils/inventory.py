@@ -0,0 +1,97 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, case
+from sqlalchemy.sql import func
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.models import DBInventory
+from backend.utils.database import AsyncSessionLocal
+from backend.utils.upsert import upsert_increment
+from backend.utils.catalog import bump_table_version
+from backend.utils.logger import AppLogger
+
+logger = AppLogger.get_logger(__name__)
+
+class InsufficientInventoryError(Exception):
+    def __init__(self, short_items: list[dict]):
+        self.short_items = short_items
+        super().__init__(f"Insufficient inventory for products: {[item['product_id'] for item in short_items]}")
+
+def aggregate_quantities(items: list[dict]) -> dict[int, int]:
+    quantities: dict[int, int] = {}
+    for item in items:
+        quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+    return quantities
+
+async def increment_inventory(db: AsyncSession, quantities: dict[int, int]) -> None:
+    await upsert_increment(
+        db,
+        DBInventory.__table__,
+        [
+            {"product_id": product_id, "quantity": quantity}
+            for product_id, quantity in quantities.items()
+        ],
+        key_columns=["product_id"],
+        increment_columns=["quantity"],
+        set_values={"last_updated": func.now()},
+    )
+
+def find_short_items(available: dict[int, int], quantities: dict[int, int]) -> list[dict]:
+    return [
+        {
+            "product_id": product_id,
+            "requested": quantity,
+            "available": available.get(product_id, 0),
+        }
+        for product_id, quantity in sorted(quantities.items())
+        if available.get(product_id, 0) < quantity
+    ]
+
+async def lock_inventory(db: AsyncSession, product_ids) -> dict[int, int]:
+    # Lock in product_id order so concurrent reservations cannot deadlock each other
+    result = await db.execute(
+        select(DBInventory.product_id, DBInventory.quantity)
+        .where(DBInventory.product_id.in_(sorted(product_ids)))
+        .order_by(DBInventory.product_id)
+        .with_for_update()
+    )
+    return {product_id: quantity for product_id, quantity in result.all()}
+
+async def decrement_inventory(db: AsyncSession, quantities: dict[int, int]) -> int:
+    table = DBInventory.__table__
+    requested = case(quantities, value=table.c.product_id)
+    result = await db.execute(
+        update(table)
+        .where(
+            table.c.product_id.in_(quantities),
+            table.c.quantity >= requested,
+        )
+        .values(quantity=table.c.quantity - requested, last_updated=func.now())
+    )
+    return result.rowcount
+
+async def bump_inventory_version() -> None:
+    """Advance the inventory ETag version in its own short transaction.
+
+    Call it after the transaction that changed stock has committed; bumping inside that
+    transaction would hold the one version row until commit and queue every stock write behind it.
+    """
+
+    try:
+        async with AsyncSessionLocal() as session:
+            await bump_table_version(session, "inventory")
+            await session.commit()
+    except SQLAlchemyError as e:
+        logger.warning("Could not bump the inventory version: %s", e)
+
+async def reserve_inventory(db: AsyncSession, quantities: dict[int, int]) -> None:
+    if not quantities:
+        return
+
+    available = await lock_inventory(db, quantities)
+    short_items = find_short_items(available, quantities)
+    if short_items:
+        raise InsufficientInventoryError(short_items)
+
+    if await decrement_inventory(db, quantities) != len(quantities):
+        raise InsufficientInventoryError(find_short_items(await lock_inventory(db, quantities), quantities))
@@ -0,0 +1,69 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, exists
+
+from backend.models import DBOrder, DBOrderItem, DBSale, DBSaleItem
+
+LINE_ITEM_FIELDS = ("product_id", "supplier_id", "quantity", "unit_price", "subtotal")
+
+def order_item_rows(orders: list[DBOrder]) -> list[dict]:
+    return [
+        {
+            "order_id": order.order_id,
+            "timestamp": order.timestamp,
+            **{field: item[field] for field in LINE_ITEM_FIELDS},
+        }
+        for order in orders
+        for item in order.order_details
+    ]
+
+def sale_item_rows(sales: list[DBSale]) -> list[dict]:
+    return [
+        {
+            "sale_id": sale.sale_id,
+            "timestamp": sale.timestamp,
+            **{field: item[field] for field in LINE_ITEM_FIELDS},
+        }
+        for sale in sales
+        for item in sale.sale_details
+    ]
+
+async def insert_order_items(db: AsyncSession, orders: list[DBOrder]) -> None:
+    rows = order_item_rows(orders)
+    if rows:
+        await db.execute(insert(DBOrderItem.__table__), rows)
+
+async def insert_sale_items(db: AsyncSession, sales: list[DBSale]) -> None:
+    rows = sale_item_rows(sales)
+    if rows:
+        await db.execute(insert(DBSaleItem.__table__), rows)
+
+async def backfill_line_items(db: AsyncSession, batch_size: int = 1000) -> dict[str, int]:
+    """Write order_items / sale_items for headers that predate the line-item tables."""
+
+    counts = {"orders": 0, "sales": 0}
+    jobs = (
+        ("orders", DBOrder, DBOrder.order_id, DBOrderItem.order_id, insert_order_items),
+        ("sales", DBSale, DBSale.sale_id, DBSaleItem.sale_id, insert_sale_items),
+    )
+
+    for name, header_model, header_key, item_key, insert_items in jobs:
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(header_model)
+                .where(header_key > last_id, ~exists().where(item_key == header_key))
+                .order_by(header_key)
+                .limit(batch_size)
+            )
+            headers = result.scalars().all()
+            if not headers:
+                break
+
+            await insert_items(db, headers)
+            await db.commit()
+            db.expunge_all()
+
+            counts[name] += len(headers)
+            last_id = getattr(headers[-1], header_key.key)
+
+    return counts
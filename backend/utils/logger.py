@@ -1,25 +1,143 @@
 import os
+import copy
+import json
+import queue
+import atexit
+import random
 import logging
 from logging import Logger
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
 load_dotenv()
 
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] [%(name)s] %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; extra attributes passed via `extra=` are included as fields."""
+
+    _RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in self._RESERVED)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+class StructuredQueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback in `exc_text` instead of folding it into the message."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the %-args on this thread (the objects may change later), but leave the
+        # layout, traceback included, to the listener's formatter
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of INFO-and-below records per logger; warnings and errors always pass.
+
+    `rates` maps logger names to the fraction kept; a name also covers its child loggers.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            prefix = name
+            rate = 1.0
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+def parse_sample_rates(spec: str) -> dict[str, float]:
+    """Parse LOG_SAMPLE_RATES, e.g. "backend.routes.products_routes=0.1,backend.routes.inventory_routes=0.25"."""
+
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = entry.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
 class AppLogger:
+    """Configures the root logger once: records are queued on the calling thread and written by a background listener."""
+
     _configured: bool = False
+    _queue_handler: Optional[QueueHandler] = None
+    _listener: Optional[QueueListener] = None
+    _fallback_handlers: list[logging.Handler] = []
+
+    @staticmethod
+    def _file_handler(log_path: Path) -> logging.Handler:
+        backup_count = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+        rotation = os.getenv("LOG_ROTATION", "size").lower()
+        if rotation == "time":
+            return TimedRotatingFileHandler(
+                log_path,
+                when=os.getenv("LOG_ROTATE_WHEN", "midnight"),
+                backupCount=backup_count,
+                encoding="utf-8",
+            )
+        if rotation == "size":
+            return RotatingFileHandler(
+                log_path,
+                maxBytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+                backupCount=backup_count,
+                encoding="utf-8",
+            )
+        return logging.FileHandler(log_path, encoding="utf-8")
 
     @classmethod
-    def _configure(cls, level: int = logging.INFO, log_file: str = os.getenv("LOG_FILE")) -> None:
+    def _configure(cls, level: int | str = logging.INFO, log_file: Optional[str] = None) -> None:
         if cls._configured: return
 
-        log_path = Path(log_file)
+        root_logger = logging.getLogger()
+        # Replace the synchronous handlers left behind by a previous shutdown()
+        for handler in cls._fallback_handlers:
+            root_logger.removeHandler(handler)
+            handler.close()
+        cls._fallback_handlers = []
+
+        level = os.getenv("LOG_LEVEL", logging.getLevelName(level)).upper()
+        log_path = Path(log_file or os.getenv("LOG_FILE", "app.log"))
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        formatter = logging.Formatter(
-            fmt="%(asctime)s [%(levelname)s] [%(name)s] %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
+        if os.getenv("LOG_FORMAT", "text").lower() == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(fmt=TEXT_FORMAT, datefmt=DATE_FORMAT)
 
         # Console handler
         console_handler = logging.StreamHandler()
@@ -27,19 +145,54 @@ class AppLogger:
         console_handler.setLevel(level)
 
         # File handler
-        file_handler = logging.FileHandler(log_path, encoding="utf-8")
+        file_handler = cls._file_handler(log_path)
         file_handler.setFormatter(formatter)
         file_handler.setLevel(level)
 
+        # Handlers run on the listener's thread, so stream and file I/O stay off the event loop
+        log_queue = queue.SimpleQueue()
+        cls._listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+        cls._queue_handler = StructuredQueueHandler(log_queue)
+        sample_rates = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+        if sample_rates:
+            cls._queue_handler.addFilter(SamplingFilter(sample_rates))
+
         # Root logger
-        root_logger = logging.getLogger()
         root_logger.setLevel(level)
-        root_logger.addHandler(console_handler)
-        root_logger.addHandler(file_handler)
+        root_logger.addHandler(cls._queue_handler)
 
+        cls._listener.start()
+        atexit.unregister(cls.shutdown)
+        atexit.register(cls.shutdown)
         cls._configured = True
 
     @classmethod
-    def get_logger(cls, name: Optional[str] = None, level: int = logging.INFO, log_file: str = "app.log") -> Logger:
+    def start(cls) -> None:
+        """(Re)start the background writer, e.g. at app startup after an earlier shutdown()."""
+
+        cls._configure()
+
+    @classmethod
+    def get_logger(cls, name: Optional[str] = None, level: int | str = logging.INFO, log_file: Optional[str] = None) -> Logger:
         cls._configure(level=level, log_file=log_file)
         return logging.getLogger(name)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Flush queued records and stop the listener.
+
+        Records logged until the next start() are written synchronously, so nothing is lost.
+        """
+
+        if cls._listener is None:
+            return
+
+        cls._listener.stop()
+        root_logger = logging.getLogger()
+        root_logger.removeHandler(cls._queue_handler)
+        cls._fallback_handlers = list(cls._listener.handlers)
+        for handler in cls._fallback_handlers:
+            root_logger.addHandler(handler)
+        cls._listener = None
+        cls._queue_handler = None
+        cls._configured = False
@@ -0,0 +1,276 @@
+import os
+import time
+import logging
+from bisect import bisect_left
+from typing import Callable, Iterable
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from dotenv import load_dotenv
+
+try:
+    from fastapi.routing import iter_route_contexts
+except ImportError:
+    # Older FastAPI copies included routes with the include prefix already in their path
+    iter_route_contexts = None
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+# Metrics are only updated from the event loop thread (SQLAlchemy pool and connection
+# events run in the loop's greenlets), so plain dict updates need no locking.
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labelnames: tuple[str, ...], labels: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield f"{self.name}_total", _format_labels(self.labelnames, labels), value
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+class CallbackMetric(Metric):
+    """Reads its value(s) when scraped; `func` returns a number or a {label tuple: number} dict."""
+
+    def __init__(self, name: str, documentation: str, kind: str, func: Callable[[], float | dict], labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.func = func
+
+    def samples(self):
+        suffix = "_total" if self.kind == "counter" else ""
+        values = self.func()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in values.items():
+            yield f"{self.name}{suffix}", _format_labels(self.labelnames, labels), value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last is +Inf), sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def samples(self):
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"'), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), cumulative
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, kind: str, func: Callable[[], float | dict], labelnames: Iterable[str] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, kind, func, labelnames))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests", "HTTP requests by route template, method and status code", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and method", ("method", "route")
+)
+DB_POOL_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection, including new connects", buckets=POOL_WAIT_BUCKETS
+)
+DB_TRANSACTIONS = registry.counter(
+    "db_transactions", "Committed and rolled back connection-level transactions", ("outcome",)
+)
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started_at)
+
+# SQLAlchemy names pool loggers after the pool class's module; keep this one as quiet as
+# the "sqlalchemy" logger it would otherwise inherit from
+logging.getLogger(f"{__name__}.{InstrumentedAsyncQueuePool.__name__}").setLevel(logging.WARNING)
+
+def instrument_engine(engine) -> None:
+    """Export pool gauges for `engine` and count its commits and rollbacks."""
+
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "checkedout"):
+        # Read through the engine, since dispose() replaces the pool object
+        registry.callback("db_pool_size", "Configured pool size", "gauge", lambda: engine.sync_engine.pool.size())
+        registry.callback("db_pool_checked_out", "Connections currently checked out", "gauge", lambda: engine.sync_engine.pool.checkedout())
+        registry.callback("db_pool_checked_in", "Idle connections in the pool", "gauge", lambda: engine.sync_engine.pool.checkedin())
+        registry.callback("db_pool_overflow", "Connections open beyond pool_size (negative while the pool is filling)", "gauge", lambda: engine.sync_engine.pool.overflow())
+
+    event.listen(engine.sync_engine, "commit", lambda conn: DB_TRANSACTIONS.inc("commit"))
+    event.listen(engine.sync_engine, "rollback", lambda conn: DB_TRANSACTIONS.inc("rollback"))
+
+def instrument_password_executor(executor) -> None:
+    registry.callback("password_hash_in_flight", "bcrypt jobs running or queued", "gauge", lambda: executor.in_flight)
+    registry.callback("password_hash_completed", "bcrypt jobs completed", "counter", lambda: executor.stats.completed)
+    registry.callback("password_hash_rejected", "bcrypt jobs rejected because the backlog was full", "counter", lambda: executor.stats.rejected)
+    registry.callback("password_hash_queue_wait_seconds", "Total time bcrypt jobs waited for a worker", "counter", lambda: executor.stats.queue_wait_total)
+    registry.callback("password_hash_seconds", "Total time spent hashing and verifying passwords", "counter", lambda: executor.stats.hash_time_total)
+
+# id(route) -> full path template, built from the app's routes on first use
+_route_templates: dict[int, str] = {}
+
+def _build_route_templates(app) -> None:
+    if iter_route_contexts is None:
+        routes = ((route, route.path_format) for route in app.routes if hasattr(route, "path_format"))
+    else:
+        # The route FastAPI puts in the scope carries only its own router's prefix;
+        # its route context has the template including every enclosing include prefix
+        routes = ((context.route, context.path_format) for context in iter_route_contexts(app.routes))
+    for route, path_format in routes:
+        _route_templates.setdefault(id(route), path_format)
+
+def route_label(scope) -> str:
+    """The template of the route that handled `scope`, e.g. /api/v1/products/{product_id}.
+
+    FastAPI stores the matched route in the scope once routing is done; anything unrouted
+    shares one label so unknown paths can't grow the series count.
+    """
+
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    if not _route_templates:
+        _build_route_templates(scope["app"])
+    return _route_templates.get(id(route)) or getattr(route, "path_format", "unmatched")
+
+_active_requests: dict[int, dict] = {}
+
+def _in_flight_by_route() -> dict[tuple, int]:
+    counts: dict[tuple, int] = {}
+    for scope in _active_requests.values():
+        labels = (scope["method"], route_label(scope))
+        counts[labels] = counts.get(labels, 0) + 1
+    return counts
+
+# Labelled at scrape time, when routing has run for every in-flight request
+HTTP_REQUESTS_IN_FLIGHT = registry.callback(
+    "http_requests_in_flight", "HTTP requests currently being handled", "gauge", _in_flight_by_route, ("method", "route")
+)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request count, latency and in-flight requests per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        _active_requests[id(scope)] = scope
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            del _active_requests[id(scope)]
+            method, route = scope["method"], route_label(scope)
+            HTTP_REQUEST_DURATION.observe(elapsed, method, route)
+            HTTP_REQUESTS.inc(method, route, status_code)
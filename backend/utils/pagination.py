@@ -0,0 +1,60 @@
+import os
+import json
+import base64
+import binascii
+from typing import Any, Callable, Optional, Sequence
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return values
+
+def apply_keyset(sql_query: Select, key_columns: list, page: PageParams, descending: bool = False) -> Select:
+    """Order `sql_query` by `key_columns`, resume after `page.cursor` and fetch one row past the page."""
+
+    if page.cursor:
+        values = decode_cursor(page.cursor, len(key_columns))
+        if len(key_columns) == 1:
+            key, value = key_columns[0], values[0]
+        else:
+            key, value = tuple_(*key_columns), tuple_(*values)
+        sql_query = sql_query.where(key < value if descending else key > value)
+
+    order_by = [column.desc() if descending else column.asc() for column in key_columns]
+    return sql_query.order_by(*order_by).limit(page.limit + 1)
+
+def split_page(rows: Sequence[Any], page: PageParams, key_getter: Callable[[Any], Sequence[Any]]) -> tuple[list, Optional[str]]:
+    rows = list(rows)
+    if len(rows) <= page.limit:
+        return rows, None
+
+    rows = rows[:page.limit]
+    return rows, encode_cursor(key_getter(rows[-1]))
@@ -0,0 +1,96 @@
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from fastapi import HTTPException, status
+
+from backend.utils.auth import hash_password, verify_password
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class PasswordWorkStats:
+    def __init__(self):
+        self.completed: int = 0
+        self.rejected: int = 0
+        self.queue_wait_total: float = 0.0
+        self.queue_wait_max: float = 0.0
+        self.hash_time_total: float = 0.0
+        self.hash_time_max: float = 0.0
+
+    def observe(self, queue_wait: float, hash_time: float) -> None:
+        self.completed += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.hash_time_total += hash_time
+        self.hash_time_max = max(self.hash_time_max, hash_time)
+
+    def snapshot(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_avg_ms": round(self.queue_wait_total / completed * 1000, 3),
+            "queue_wait_max_ms": round(self.queue_wait_max * 1000, 3),
+            "hash_time_avg_ms": round(self.hash_time_total / completed * 1000, 3),
+            "hash_time_max_ms": round(self.hash_time_max * 1000, 3),
+        }
+
+class PasswordExecutor:
+    """Runs bcrypt work on a dedicated thread pool with a bounded backlog."""
+
+    def __init__(self, max_workers: int, max_queue_depth: int):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.stats = PasswordWorkStats()
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._in_flight >= self.max_workers + self.max_queue_depth:
+            self.stats.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted_at = time.perf_counter()
+
+        def timed_call():
+            started_at = time.perf_counter()
+            result = func(*args)
+            return result, started_at - submitted_at, time.perf_counter() - started_at
+
+        self._in_flight += 1
+        try:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password")
+            loop = asyncio.get_running_loop()
+            result, queue_wait, hash_time = await loop.run_in_executor(self._executor, timed_call)
+        finally:
+            self._in_flight -= 1
+
+        self.stats.observe(queue_wait, hash_time)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+password_executor = PasswordExecutor(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue_depth=int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", "32")),
+)
+
+async def hash_password_async(password: str) -> str:
+    return await password_executor.run(hash_password, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await password_executor.run(verify_password, plain, hashed)
@@ -0,0 +1,84 @@
+import re
+from typing import Literal, Optional
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, and_
+
+from backend.models import DBProduct
+
+SORT_COLUMNS = {
+    "product_id": DBProduct.product_id,
+    "product_name": DBProduct.product_name,
+    "unit_price": DBProduct.unit_price,
+}
+# InnoDB's default innodb_ft_min_token_size; shorter terms are never in the FULLTEXT index
+FULLTEXT_MIN_TERM_LENGTH = 3
+_FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+class ProductSearchParams:
+    def __init__(
+        self,
+        category: Optional[str] = Query(None, description="Filter by exact category"),
+        min_price: Optional[float] = Query(None, ge=0, description="Minimum unit price (inclusive)"),
+        max_price: Optional[float] = Query(None, ge=0, description="Maximum unit price (inclusive)"),
+        name: Optional[str] = Query(None, min_length=1, max_length=200, description="Search product names"),
+        name_match: Literal["prefix", "contains"] = Query("prefix", description="prefix: name starts with, contains: words anywhere in the name"),
+        sort_by: Literal["product_id", "product_name", "unit_price"] = Query("product_id"),
+        order: Literal["asc", "desc"] = Query("asc"),
+    ):
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="min_price must not exceed max_price",
+            )
+
+        self.category = category
+        self.min_price = min_price
+        self.max_price = max_price
+        self.name = name
+        self.name_match = name_match
+        self.sort_by = sort_by
+        self.order = order
+
+    @property
+    def descending(self) -> bool:
+        return self.order == "desc"
+
+    @property
+    def key_columns(self) -> list:
+        # product_id breaks ties so the keyset cursor stays unique
+        if self.sort_by == "product_id":
+            return [DBProduct.product_id]
+        return [SORT_COLUMNS[self.sort_by], DBProduct.product_id]
+
+def _name_filter(name: str, name_match: str, dialect: str):
+    if name_match == "prefix":
+        # LIKE 'term%' can range-scan ix_products_product_name
+        return DBProduct.product_name.startswith(name, autoescape=True)
+
+    if dialect in ("mysql", "mariadb"):
+        terms = _FULLTEXT_OPERATORS.sub(" ", name).split()
+        indexed = [term for term in terms if len(term) >= FULLTEXT_MIN_TERM_LENGTH]
+        if indexed:
+            # Boolean mode: every word must appear, each matched as a word prefix; words
+            # too short for the index are still required, via LIKE on the matched rows
+            return and_(
+                DBProduct.product_name.match(" ".join(f"+{term}*" for term in indexed)),
+                *(
+                    DBProduct.product_name.icontains(term, autoescape=True)
+                    for term in terms
+                    if len(term) < FULLTEXT_MIN_TERM_LENGTH
+                ),
+            )
+
+    return DBProduct.product_name.icontains(name, autoescape=True)
+
+def apply_product_search(sql_query: Select, search: ProductSearchParams, dialect: str) -> Select:
+    if search.category is not None:
+        sql_query = sql_query.where(DBProduct.category == search.category)
+    if search.min_price is not None:
+        sql_query = sql_query.where(DBProduct.unit_price >= search.min_price)
+    if search.max_price is not None:
+        sql_query = sql_query.where(DBProduct.unit_price <= search.max_price)
+    if search.name:
+        sql_query = sql_query.where(_name_filter(search.name, search.name_match, dialect))
+    return sql_query
@@ -0,0 +1,113 @@
+import os
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+from backend.utils.logger import AppLogger
+from backend.utils.metrics import route_label
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = AppLogger.get_logger(__name__)
+
+SQL_INSTRUMENTATION_ENABLED = os.getenv("SQL_INSTRUMENTATION_ENABLED", "true").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_PLACEHOLDER_LIST = re.compile(rf"{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+")
+_VALUES_ROWS = re.compile(r"(\([^()]*\))(?:\s*,\s*\([^()]*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    """Collapse whitespace, IN lists and multi-row VALUES so the same query with different sizes groups together."""
+
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("?, ...", shape)
+    return _VALUES_ROWS.sub(r"\1, ...", shape)
+
+class RequestQueryStats:
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes: dict[str, int] = {}
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.db_time += elapsed
+
+        shape = statement_shape(statement)
+        repeats = self.shapes.get(shape, 0) + 1
+        self.shapes[shape] = repeats
+        # Warn once, when a shape first crosses the threshold
+        if repeats == N_PLUS_ONE_THRESHOLD + 1:
+            logger.warning(
+                "Possible N+1 on %s: statement ran more than %s times in one request: %s",
+                self.route,
+                N_PLUS_ONE_THRESHOLD,
+                shape[:300],
+            )
+
+    @property
+    def route(self) -> str:
+        # Statements run after routing, so the matched route is already in the scope
+        return f"{self.scope['method']} {route_label(self.scope)}"
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_time * 1000:.2f};desc="{self.count} queries"'
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        route = stats.route if stats is not None else "-"
+        logger.warning("Slow query (%.1fms) on %s: %s", elapsed * 1000, route, _WHITESPACE.sub(' ', statement).strip()[:1000])
+
+def _handle_error(exception_context) -> None:
+    # after_cursor_execute does not run for failed statements; drop their start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+def instrument_queries(engine) -> None:
+    """Time every statement on `engine`, attributing it to the current request when there is one."""
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware that collects per-request SQL stats and reports them in a Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"server-timing", stats.server_timing().encode())]
+            await send(message)
+
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
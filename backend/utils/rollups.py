@@ -0,0 +1,148 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete, func
+
+from backend.models import (
+    DBProduct,
+    DBOrder,
+    DBOrderItem,
+    DBSale,
+    DBSaleItem,
+    DBOrderRollup,
+    DBSalesRollup,
+)
+from backend.utils.upsert import upsert_increment
+
+GRANULARITIES = ("hour", "day")
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def accumulate_rollup(rows: dict[tuple, dict], item: dict) -> None:
+    for granularity in GRANULARITIES:
+        key = (granularity, bucket_start(item["timestamp"], granularity), item["product_id"])
+        row = rows.get(key)
+        if row is None:
+            rows[key] = {
+                "granularity": key[0],
+                "bucket_start": key[1],
+                "product_id": key[2],
+                "supplier_id": item["supplier_id"],
+                "units": item["quantity"],
+                "amount": item["subtotal"],
+            }
+        else:
+            row["units"] += item["quantity"]
+            row["amount"] += item["subtotal"]
+
+def rollup_rows(line_items: list[dict]) -> list[dict]:
+    """Aggregate line items (with a `timestamp` key) into one row per granularity, bucket and product."""
+
+    rows: dict[tuple, dict] = {}
+    for item in line_items:
+        accumulate_rollup(rows, item)
+    return list(rows.values())
+
+async def _apply_rollups(db: AsyncSession, rollup_model, line_items: list[dict]) -> None:
+    await upsert_increment(
+        db,
+        rollup_model.__table__,
+        rollup_rows(line_items),
+        key_columns=["granularity", "bucket_start", "product_id"],
+        increment_columns=["units", "amount"],
+    )
+
+async def apply_order_rollups(db: AsyncSession, orders: list[DBOrder]) -> None:
+    await _apply_rollups(
+        db,
+        DBOrderRollup,
+        [{**item, "timestamp": order.timestamp} for order in orders for item in order.order_details],
+    )
+
+async def apply_sales_rollups(db: AsyncSession, sales: list[DBSale]) -> None:
+    await _apply_rollups(
+        db,
+        DBSalesRollup,
+        [{**item, "timestamp": sale.timestamp} for sale in sales for item in sale.sale_details],
+    )
+
+async def rebuild_rollups(db: AsyncSession, batch_size: int = 5000) -> dict[str, int]:
+    """Recompute both rollup tables from the order_items / sale_items history."""
+
+    counts = {}
+    jobs = (
+        ("orders", DBOrderRollup, DBOrderItem),
+        ("sales", DBSalesRollup, DBSaleItem),
+    )
+
+    for name, rollup_model, item_model in jobs:
+        aggregated: dict[tuple, dict] = {}
+        result = await db.stream(
+            select(
+                item_model.product_id,
+                item_model.supplier_id,
+                item_model.quantity,
+                item_model.subtotal,
+                item_model.timestamp,
+            ).execution_options(yield_per=batch_size)
+        )
+        async for row in result.mappings():
+            accumulate_rollup(aggregated, row)
+
+        rows = list(aggregated.values())
+
+        await db.execute(delete(rollup_model))
+        for start in range(0, len(rows), batch_size):
+            await db.execute(insert(rollup_model.__table__), rows[start:start + batch_size])
+        await db.commit()
+
+        counts[name] = len(rows)
+
+    return counts
+
+async def query_rollups(
+    db: AsyncSession,
+    rollup_model,
+    start: datetime,
+    end: datetime,
+    granularity: str,
+    group_by: str,
+    product_id: Optional[int] = None,
+) -> list[dict]:
+    key_column = {
+        "total": None,
+        "product": rollup_model.product_id,
+        "category": DBProduct.category,
+        "supplier": rollup_model.supplier_id,
+    }[group_by]
+
+    columns = [rollup_model.bucket_start]
+    if key_column is not None:
+        columns.append(key_column.label("key"))
+
+    sql_query = (
+        select(
+            *columns,
+            func.sum(rollup_model.units).label("units"),
+            func.sum(rollup_model.amount).label("amount"),
+        )
+        .where(
+            rollup_model.granularity == granularity,
+            rollup_model.bucket_start >= start,
+            rollup_model.bucket_start < end,
+        )
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+    if group_by == "category":
+        sql_query = sql_query.select_from(rollup_model).join(
+            DBProduct, DBProduct.product_id == rollup_model.product_id
+        )
+    if product_id is not None:
+        sql_query = sql_query.where(rollup_model.product_id == product_id)
+
+    result = await db.execute(sql_query)
+    return [dict(row) for row in result.mappings().all()]
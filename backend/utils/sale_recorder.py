@@ -0,0 +1,283 @@
+import os
+import uuid
+import asyncio
+from datetime import datetime, timedelta
+from typing import Hashable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete
+
+from backend.models import DBSale, DBInventory, DBSaleHandle
+from backend.utils.database import AsyncSessionLocal
+from backend.utils.cache import TTLCache
+from backend.utils.inventory import (
+    InsufficientInventoryError,
+    aggregate_quantities,
+    find_short_items,
+    lock_inventory,
+    bump_inventory_version,
+    decrement_inventory,
+)
+from backend.utils.line_items import insert_sale_items
+from backend.utils.rollups import apply_sales_rollups
+from backend.utils.logger import AppLogger
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = AppLogger.get_logger(__name__)
+
+async def record_sales(
+    db: AsyncSession,
+    entries: list[tuple[Hashable, list[dict]]],
+) -> tuple[dict[Hashable, DBSale], dict[Hashable, list[dict]]]:
+    """Reserve stock for and write a group of enriched sales in the caller's transaction.
+
+    Stock is allocated to entries in the given order; an entry that no longer fits
+    is returned in the shortages map instead of failing the whole group.
+    """
+
+    available = await lock_inventory(
+        db,
+        {item["product_id"] for _, enriched_items in entries for item in enriched_items},
+    )
+
+    accepted = []
+    shortages: dict[Hashable, list[dict]] = {}
+    reserved: dict[int, int] = {}
+    for key, enriched_items in entries:
+        quantities = aggregate_quantities(enriched_items)
+        short_items = find_short_items(available, quantities)
+        if short_items:
+            shortages[key] = short_items
+            continue
+
+        for product_id, quantity in quantities.items():
+            available[product_id] = available.get(product_id, 0) - quantity
+            reserved[product_id] = reserved.get(product_id, 0) + quantity
+        accepted.append((key, enriched_items))
+
+    if not accepted:
+        return {}, shortages
+
+    if await decrement_inventory(db, reserved) != len(reserved):
+        raise InsufficientInventoryError(find_short_items(await lock_inventory(db, reserved), reserved))
+
+    sales = [
+        DBSale(
+            sale_details=enriched_items,
+            total_amount=sum(item["subtotal"] for item in enriched_items),
+            timestamp=datetime.now(),
+        )
+        for _, enriched_items in accepted
+    ]
+    db.add_all(sales)
+    await db.flush()
+    await insert_sale_items(db, sales)
+    await apply_sales_rollups(db, sales)
+
+    return {key: sale for (key, _), sale in zip(accepted, sales)}, shortages
+
+class SaleWriteBehind:
+    """Queues validated sales and writes them in group commits of `batch_size` sales or `interval_ms`.
+
+    Stock is reserved against an in-process ledger when a sale is submitted, so this
+    worker never accepts more than it has seen on hand; the group commit re-checks
+    against locked rows and marks the handle failed if another worker got there first.
+
+    Each outcome is stored in sale_handles in the group commit's transaction, so a handle
+    can be polled from any worker for `handle_ttl_seconds`. Only the accepting worker
+    knows a handle while it is still queued (at most `interval_ms` plus the commit).
+    """
+
+    _STOP = object()
+
+    def __init__(self, batch_size: int, interval_ms: float, max_queue_size: int, handle_ttl_seconds: float):
+        self.batch_size = batch_size
+        self.handle_ttl_seconds = handle_ttl_seconds
+        self.interval = interval_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.handles = TTLCache(max_size=max(max_queue_size * 10, 1000), ttl_seconds=handle_ttl_seconds)
+        self._reserved: dict[int, int] = {}
+        self._ledger_lock: Optional[asyncio.Lock] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._ledger_lock = asyncio.Lock()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run(), name="sale-write-behind")
+        logger.info("Sale write-behind started (batch_size=%s, interval=%.0fms)", self.batch_size, self.interval * 1000)
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        # The sentinel queues behind every accepted sale, so they are all committed before exit
+        await self._queue.put(self._STOP)
+        await self._task
+        self._task = None
+        logger.info("Sale write-behind drained and stopped")
+
+    @staticmethod
+    def new_handle() -> str:
+        return uuid.uuid4().hex
+
+    async def submit(self, db: AsyncSession, enriched_items: list[dict], handle: Optional[str] = None) -> str:
+        if not self.running:
+            raise RuntimeError("Sale write-behind is not running")
+        if self._queue.full():
+            raise asyncio.QueueFull()
+
+        quantities = aggregate_quantities(enriched_items)
+        handle = handle or self.new_handle()
+        async with self._ledger_lock:
+            result = await db.execute(
+                select(DBInventory.product_id, DBInventory.quantity).where(
+                    DBInventory.product_id.in_(quantities)
+                )
+            )
+            available = {
+                product_id: quantity - self._reserved.get(product_id, 0)
+                for product_id, quantity in result.all()
+            }
+            short_items = find_short_items(available, quantities)
+            if short_items:
+                raise InsufficientInventoryError(short_items)
+
+            # The queue may have filled during the read; check before reserving anything
+            self._queue.put_nowait((handle, enriched_items))
+            for product_id, quantity in quantities.items():
+                self._reserved[product_id] = self._reserved.get(product_id, 0) + quantity
+            self.handles.set(handle, {"handle": handle, "status": "queued"})
+
+        return handle
+
+    def get_status(self, handle: str) -> Optional[dict]:
+        return self.handles.get(handle)
+
+    async def lookup(self, db: AsyncSession, handle: str) -> Optional[dict]:
+        """Status of `handle` from this worker's memory, else from the outcome stored by whichever worker committed it."""
+
+        sale_status = self.handles.get(handle)
+        if sale_status is not None:
+            return sale_status
+
+        result = await db.execute(
+            select(DBSaleHandle).where(DBSaleHandle.handle == handle, DBSaleHandle.expires_at > datetime.now())
+        )
+        stored = result.scalar_one_or_none()
+        if stored is None:
+            return None
+        if stored.status == "committed":
+            return {"handle": handle, "status": "committed", "sale_id": stored.sale_id}
+        return {"handle": handle, "status": stored.status, **(stored.detail or {})}
+
+    async def purge_expired(self, db: AsyncSession) -> int:
+        result = await db.execute(delete(DBSaleHandle).where(DBSaleHandle.expires_at <= datetime.now()))
+        await db.commit()
+        return result.rowcount
+
+    def _outcome_rows(self, outcomes: dict[str, dict]) -> list[dict]:
+        expires_at = datetime.now() + timedelta(seconds=self.handle_ttl_seconds)
+        return [
+            {
+                "handle": handle,
+                "status": outcome["status"],
+                "sale_id": outcome.get("sale_id"),
+                "detail": {key: value for key, value in outcome.items() if key not in ("handle", "status", "sale_id")} or None,
+                "expires_at": expires_at,
+            }
+            for handle, outcome in outcomes.items()
+        ]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is self._STOP:
+                break
+
+            batch = [entry]
+            deadline = loop.time() + self.interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is self._STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            await self._commit(batch)
+
+    def _release(self, batch: list[tuple[str, list[dict]]]) -> None:
+        for _, enriched_items in batch:
+            for product_id, quantity in aggregate_quantities(enriched_items).items():
+                remaining = self._reserved.get(product_id, 0) - quantity
+                if remaining > 0:
+                    self._reserved[product_id] = remaining
+                else:
+                    self._reserved.pop(product_id, None)
+
+    async def _commit(self, batch: list[tuple[str, list[dict]]]) -> None:
+        released = False
+        try:
+            async with AsyncSessionLocal() as session:
+                sales, shortages = await record_sales(session, batch)
+                outcomes = {
+                    handle: {"handle": handle, "status": "committed", "sale_id": sale.sale_id}
+                    for handle, sale in sales.items()
+                }
+                outcomes.update(
+                    (handle, {"handle": handle, "status": "failed", "error": "Insufficient inventory", "short_items": short_items})
+                    for handle, short_items in shortages.items()
+                )
+                await session.execute(insert(DBSaleHandle.__table__), self._outcome_rows(outcomes))
+                # Commit and release under the ledger lock, so no submit() sees the
+                # decremented stock while this batch is still reserved on the ledger
+                async with self._ledger_lock:
+                    await session.commit()
+                    self._release(batch)
+                    released = True
+            if sales:
+                await bump_inventory_version()
+
+            for handle, outcome in outcomes.items():
+                self.handles.set(handle, outcome)
+            logger.info("Group-committed %s sales (%s rejected for stock)", len(sales), len(shortages))
+
+        except Exception as e:
+            logger.error("Error group-committing %s sales: %s", len(batch), e)
+            outcomes = {handle: {"handle": handle, "status": "failed", "error": str(e)} for handle, _ in batch}
+            for handle, outcome in outcomes.items():
+                self.handles.set(handle, outcome)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(insert(DBSaleHandle.__table__), self._outcome_rows(outcomes))
+                    await session.commit()
+            except Exception as store_error:
+                logger.error("Error storing the failed status of %s sales: %s", len(batch), store_error)
+
+        finally:
+            if not released:
+                async with self._ledger_lock:
+                    self._release(batch)
+
+sale_writer = SaleWriteBehind(
+    batch_size=int(os.getenv("SALES_GROUP_COMMIT_SIZE", "100")),
+    interval_ms=float(os.getenv("SALES_GROUP_COMMIT_INTERVAL_MS", "20")),
+    max_queue_size=int(os.getenv("SALES_WRITE_BEHIND_QUEUE_SIZE", "10000")),
+    # As long as an Idempotency-Key replay can hand the handle back out
+    handle_ttl_seconds=float(os.getenv("SALES_HANDLE_TTL_SECONDS", os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))),
+)
@@ -1,8 +1,9 @@
 import os
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from backend.models import DBUser, DBSupplier, DBProduct, DBInventory
+from sqlalchemy import select, insert, exists
+from backend.models import DBUser, DBSupplier, DBProduct, DBInventory, DBAppMetadata
 from backend.utils.auth import hash_password
+from backend.utils.catalog import bump_table_version
 from backend.utils.logger import AppLogger
 from backend.utils.constants import SEED_PRODUCTS_DATA, SEED_SUPPLIERS_DATA, SEED_INVENTORY_DATA
 from dotenv import load_dotenv
@@ -10,64 +11,67 @@ load_dotenv()
 
 logger = AppLogger.get_logger(__name__)
 
-async def seed_database(db: AsyncSession):
-    """Seed the database with initial data if tables are empty"""
+SEED_MARKER_KEY = "seeded"
 
-    result = await db.execute(select(DBUser).limit(1))
-    existing_users = result.scalars().first()
+async def is_seeded(db: AsyncSession) -> bool:
+    result = await db.execute(select(DBAppMetadata.value).where(DBAppMetadata.key == SEED_MARKER_KEY))
+    return result.scalar_one_or_none() is not None
 
-    if existing_users:
+async def seed_database(db: AsyncSession) -> bool:
+    """Seed empty tables with the initial data in a single transaction.
+
+    Returns False without touching anything when the seeded marker is already set.
+    """
+
+    if await is_seeded(db):
+        logger.info("Database already seeded. Skipping...")
+        return False
+
+    # One round trip tells us which tables already hold data
+    result = await db.execute(
+        select(
+            exists(select(DBUser.user_id)),
+            exists(select(DBSupplier.supplier_id)),
+            exists(select(DBProduct.product_id)),
+            exists(select(DBInventory.product_id)),
+        )
+    )
+    has_users, has_suppliers, has_products, has_inventory = result.one()
+
+    if has_users:
         logger.info("USERS table already seeded. Skipping...")
     else:
-        raw = str(os.getenv("DEFAULT_PASSWORD")).strip()
-        print(f"Password length (chars): {len(raw)}, bytes: {len(raw.encode())}")
-        hashed = hash_password(raw)
-        print(f"=== HASHED PASSWORD: {hashed} ===")
-        user = DBUser(
-            username=os.getenv("DEFAULT_USERNAME"),
-            password=hashed,
+        await db.execute(
+            insert(DBUser).values(
+                username=os.getenv("DEFAULT_USERNAME"),
+                password=hash_password(str(os.getenv("DEFAULT_PASSWORD")).strip()),
+            )
         )
-        db.add(user)
-        await db.commit()
-        logger.info(f"Seeded default user: {user.username}")
-
-    result = await db.execute(select(DBSupplier).limit(1))
-    existing_suppliers = result.scalars().first()
+        logger.info("Seeded default user: %s", os.getenv('DEFAULT_USERNAME'))
 
-    if existing_suppliers:
+    if has_suppliers:
         logger.info("SUPPLIERS table already seeded. Skipping...")
     else:
-        for supplier_data in SEED_SUPPLIERS_DATA:
-            supplier = DBSupplier(**supplier_data)
-            db.add(supplier)
+        await db.execute(insert(DBSupplier).values(SEED_SUPPLIERS_DATA))
+        await bump_table_version(db, "suppliers")
+        logger.info("Seeded %s suppliers", len(SEED_SUPPLIERS_DATA))
 
-        await db.commit()
-        logger.info(f"Seeded {len(SEED_SUPPLIERS_DATA)} suppliers")
-
-    result = await db.execute(select(DBProduct).limit(1))
-    existing_products = result.scalars().first()
-
-    if existing_products:
+    if has_products:
         logger.info("PRODUCTS table already seeded. Skipping...")
-    else:    
-        for product_data in SEED_PRODUCTS_DATA:
-            product = DBProduct(**product_data)
-            db.add(product)
-
-        await db.commit()
-        logger.info(f"Seeded {len(SEED_PRODUCTS_DATA)} products")
-
-    result = await db.execute(select(DBInventory).limit(1))
-    existing_inventory = result.scalars().first()
+    else:
+        await db.execute(insert(DBProduct).values(SEED_PRODUCTS_DATA))
+        await bump_table_version(db, "products")
+        logger.info("Seeded %s products", len(SEED_PRODUCTS_DATA))
 
-    if existing_inventory:
+    if has_inventory:
         logger.info("INVENTORY table already seeded. Skipping...")
     else:
-        for inventory_item in SEED_INVENTORY_DATA:
-            inventory = DBInventory(**inventory_item)
-            db.add(inventory)
+        await db.execute(insert(DBInventory).values(SEED_INVENTORY_DATA))
+        await bump_table_version(db, "inventory")
+        logger.info("Seeded %s inventory records", len(SEED_INVENTORY_DATA))
 
-        await db.commit()
-        logger.info(f"Seeded {len(SEED_INVENTORY_DATA)} inventory records")
+    await db.execute(insert(DBAppMetadata).values(key=SEED_MARKER_KEY, value="true"))
+    await db.commit()
 
-    logger.info("Database seeding completed successfully!")
\ No newline at end of file
+    logger.info("Database seeding completed successfully!")
+    return True
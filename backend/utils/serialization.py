@@ -0,0 +1,54 @@
+import os
+from typing import Any, Optional, Sequence
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+from sqlalchemy import Result, Select, select
+from dotenv import load_dotenv
+
+from backend.utils.fieldsets import partial_list_adapter
+
+load_dotenv()
+
+# Opt-in: read endpoints fetch plain column rows and write JSON directly, skipping
+# ORM instances, jsonable_encoder and response_model re-validation
+FAST_SERIALIZATION_ENABLED = os.getenv("FAST_SERIALIZATION_ENABLED", "false").lower() == "true"
+
+def row_mode(fields: Optional[tuple[str, ...]] = None) -> bool:
+    return FAST_SERIALIZATION_ENABLED or bool(fields)
+
+def entity_select(model, fields: Optional[tuple[str, ...]] = None) -> Select:
+    if fields:
+        return select(*(model.__table__.columns[name] for name in fields))
+    if FAST_SERIALIZATION_ENABLED:
+        return select(*model.__table__.columns)
+    return select(model)
+
+def entity_rows(result: Result, fields: Optional[tuple[str, ...]] = None) -> Sequence[Any]:
+    # Rows and ORM instances both expose columns as attributes, so key getters work on either
+    if row_mode(fields):
+        return result.all()
+    return result.scalars().all()
+
+def entity_row(result: Result, fields: Optional[tuple[str, ...]] = None) -> Any:
+    if row_mode(fields):
+        return result.first()
+    return result.scalar_one_or_none()
+
+def dump_rows(rows: Sequence[Any], data_model: type[BaseModel], fields: Optional[tuple[str, ...]] = None) -> list[dict]:
+    if fields and not FAST_SERIALIZATION_ENABLED:
+        adapter = partial_list_adapter(data_model, fields)
+        return adapter.dump_python(adapter.validate_python(rows, from_attributes=True))
+    if fields:
+        # Rows may carry extra columns fetched for the cursor
+        return [{name: getattr(row, name) for name in fields} for row in rows]
+    return [row._asdict() for row in rows]
+
+def json_response(content: Any, response: Optional[Response] = None) -> Response:
+    """Serialize trusted DB values straight to JSON, keeping headers already set on `response`."""
+
+    return Response(
+        content=to_json(content),
+        media_type="application/json",
+        headers=dict(response.headers) if response is not None else None,
+    )
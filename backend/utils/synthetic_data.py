@@ -0,0 +1,210 @@
+import random
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Iterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, func
+
+from backend.models import DBSupplier, DBProduct, DBInventory, DBOrder, DBSale
+from backend.utils.catalog import bump_table_version
+from backend.utils.line_items import insert_order_items, insert_sale_items
+from backend.utils.rollups import apply_order_rollups, apply_sales_rollups
+from backend.utils.constants import SEED_PRODUCTS_DATA, SEED_SUPPLIERS_DATA
+from backend.utils.logger import AppLogger
+
+logger = AppLogger.get_logger(__name__)
+
+CATEGORIES = sorted({product["category"] for product in SEED_PRODUCTS_DATA})
+LOCATIONS = sorted({supplier["location"] for supplier in SEED_SUPPLIERS_DATA} | {"Delhi", "Hyderabad", "Pune", "Kolkata"})
+BRANDS = ("Acme", "Zenith", "Orbit", "Nimbus", "Vertex", "Quantum", "Helix", "Pioneer", "Summit", "Aurora")
+# Relative order volume per hour of day: quiet overnight, a lunchtime and an evening peak
+HOURLY_WEIGHTS = (1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 9, 10, 11, 10, 9, 8, 8, 9, 11, 12, 10, 7, 4, 2)
+
+def zipf_cum_weights(count: int, exponent: float) -> list[float]:
+    """Cumulative weights where rank r is drawn proportionally to 1 / r**exponent."""
+
+    return list(accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+def random_timestamp(rng: random.Random, start: datetime, days: int, hour_cum_weights: list[int]) -> datetime:
+    hour = bisect_left(hour_cum_weights, rng.random() * hour_cum_weights[-1])
+    return start + timedelta(
+        days=rng.randrange(days),
+        hours=hour,
+        seconds=rng.randrange(3600),
+        microseconds=rng.randrange(1_000_000),
+    )
+
+async def _next_id(db: AsyncSession, column) -> int:
+    result = await db.execute(select(func.max(column)))
+    return (result.scalar() or 0) + 1
+
+async def _insert_batches(db: AsyncSession, model, rows: Iterator[dict], batch_size: int) -> int:
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await db.execute(insert(model.__table__), batch)
+            await db.commit()
+            count += len(batch)
+            batch = []
+    if batch:
+        await db.execute(insert(model.__table__), batch)
+        await db.commit()
+        count += len(batch)
+    return count
+
+async def generate_dataset(
+    db: AsyncSession,
+    suppliers: int,
+    products: int,
+    orders: int,
+    sales: int,
+    days: int = 90,
+    batch_size: int = 5000,
+    zipf_exponent: float = 1.1,
+    seed: int = 42,
+) -> dict[str, int]:
+    """Bulk-load a synthetic catalog plus order and sale history.
+
+    Product popularity follows a Zipf distribution over a shuffled catalog, and
+    order/sale timestamps follow HOURLY_WEIGHTS over the last `days` days. Primary
+    keys are assigned here (continuing after the current maximum) so line items
+    and rollups can be written without reading anything back; run it against a
+    database nothing else is writing to.
+    """
+
+    rng = random.Random(seed)
+    counts = {}
+
+    first_supplier_id = await _next_id(db, DBSupplier.supplier_id)
+    new_supplier_ids = range(first_supplier_id, first_supplier_id + suppliers)
+    counts["suppliers"] = await _insert_batches(
+        db,
+        DBSupplier,
+        (
+            {
+                "supplier_id": supplier_id,
+                "supplier_name": f"{rng.choice(BRANDS)} Supply {supplier_id}",
+                "location": rng.choice(LOCATIONS),
+                "contact_email": f"contact@supplier{supplier_id}.example.com",
+                "reliability_score": round(min(10.0, max(1.0, rng.gauss(8.5, 0.8))), 1),
+            }
+            for supplier_id in new_supplier_ids
+        ),
+        batch_size,
+    )
+
+    # With no new suppliers/products requested, history is generated for the existing catalog
+    supplier_ids = list(new_supplier_ids)
+    if not supplier_ids:
+        result = await db.execute(select(DBSupplier.supplier_id))
+        supplier_ids = list(result.scalars().all())
+    if products and not supplier_ids:
+        raise ValueError("Cannot generate products without any suppliers; pass --suppliers or seed the database first")
+
+    category_prices = {category: rng.uniform(300, 60000) for category in CATEGORIES}
+    first_product_id = await _next_id(db, DBProduct.product_id)
+    catalog: dict[int, tuple[int, float]] = {}
+    if not products:
+        result = await db.execute(select(DBProduct.product_id, DBProduct.supplier_id, DBProduct.unit_price))
+        catalog = {product_id: (supplier_id, unit_price) for product_id, supplier_id, unit_price in result.all()}
+
+    def product_rows():
+        for product_id in range(first_product_id, first_product_id + products):
+            supplier_id = rng.choice(supplier_ids)
+            category = rng.choice(CATEGORIES)
+            unit_price = round(category_prices[category] * rng.lognormvariate(0, 0.35), 2)
+            catalog[product_id] = (supplier_id, unit_price)
+            yield {
+                "product_id": product_id,
+                "product_name": f"{rng.choice(BRANDS)} {category} {rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ')}{product_id}",
+                "category": category,
+                "unit_price": unit_price,
+                "supplier_id": supplier_id,
+            }
+
+    counts["products"] = await _insert_batches(db, DBProduct, product_rows(), batch_size)
+    counts["inventory"] = await _insert_batches(
+        db,
+        DBInventory,
+        (
+            {"product_id": product_id, "quantity": rng.choice((0, rng.randint(1, 10), rng.randint(10, 500)))}
+            for product_id in range(first_product_id, first_product_id + products)
+        ),
+        batch_size,
+    )
+    await bump_table_version(db, "suppliers")
+    await bump_table_version(db, "products")
+    await bump_table_version(db, "inventory")
+    await db.commit()
+
+    # Popularity rank is independent of product_id
+    ranked_products = list(catalog)
+    rng.shuffle(ranked_products)
+    popularity = zipf_cum_weights(len(ranked_products), zipf_exponent)
+    hour_cum_weights = list(accumulate(HOURLY_WEIGHTS))
+    start = (datetime.now() - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def line_items(quantity_range: tuple[int, int], price_factor: float) -> list[dict]:
+        item_count = min(1 + int(rng.expovariate(0.8)), 8)
+        product_ids = rng.choices(ranked_products, cum_weights=popularity, k=item_count)
+        items = []
+        for product_id in dict.fromkeys(product_ids):
+            supplier_id, unit_price = catalog[product_id]
+            unit_price = round(unit_price * price_factor, 2)
+            quantity = rng.randint(*quantity_range)
+            items.append(
+                {
+                    "product_id": product_id,
+                    "supplier_id": supplier_id,
+                    "quantity": quantity,
+                    "unit_price": unit_price,
+                    "subtotal": round(unit_price * quantity, 2),
+                }
+            )
+        return items
+
+    jobs = (
+        ("orders", DBOrder, "order_id", "order_details", orders, (5, 100), 0.7, insert_order_items, apply_order_rollups),
+        ("sales", DBSale, "sale_id", "sale_details", sales, (1, 3), 1.0, insert_sale_items, apply_sales_rollups),
+    )
+    for name, model, id_field, details_field, total, quantity_range, price_factor, insert_items, apply_rollups in jobs:
+        if total and not catalog:
+            raise ValueError(f"Cannot generate {name} without any products")
+        next_id = await _next_id(db, getattr(model, id_field))
+        written = 0
+        while written < total:
+            headers = []
+            for header_id in range(next_id + written, next_id + min(written + batch_size, total)):
+                items = line_items(quantity_range, price_factor)
+                headers.append(
+                    model(
+                        **{id_field: header_id, details_field: items},
+                        total_amount=round(sum(item["subtotal"] for item in items), 2),
+                        timestamp=random_timestamp(rng, start, days, hour_cum_weights),
+                    )
+                )
+
+            await db.execute(
+                insert(model.__table__),
+                [
+                    {
+                        id_field: getattr(header, id_field),
+                        details_field: getattr(header, details_field),
+                        "total_amount": header.total_amount,
+                        "timestamp": header.timestamp,
+                    }
+                    for header in headers
+                ],
+            )
+            await insert_items(db, headers)
+            await apply_rollups(db, headers)
+            await db.commit()
+
+            written += len(headers)
+            logger.info("Generated %s/%s %s", written, total, name)
+        counts[name] = written
+
+    return counts
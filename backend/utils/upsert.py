@@ -0,0 +1,101 @@
+from typing import Any, Iterable, Optional
+from sqlalchemy import Table, and_, bindparam, insert, select, tuple_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Keeps multi-row VALUES under SQLite's default 32766 bound-parameter limit
+MAX_BOUND_PARAMETERS = 30000
+
+def _merge_rows(rows: Iterable[dict], key_columns: list[str], increment_columns: list[str]) -> list[dict]:
+    merged: dict[tuple, dict] = {}
+    for row in rows:
+        key = tuple(row[column] for column in key_columns)
+        if key in merged:
+            for column in increment_columns:
+                merged[key][column] += row[column]
+        else:
+            merged[key] = dict(row)
+    # Key order means concurrent batches lock overlapping rows in the same order and can't deadlock
+    return [merged[key] for key in sorted(merged)]
+
+async def upsert_increment(
+    db: AsyncSession,
+    table: Table,
+    rows: Iterable[dict],
+    key_columns: list[str],
+    increment_columns: list[str],
+    set_values: Optional[dict[str, Any]] = None,
+) -> None:
+    """Insert `rows`, or add their `increment_columns` onto rows that already exist.
+
+    Rows sharing a key are merged first, so the whole batch is applied in one
+    statement on MySQL, SQLite and PostgreSQL and in three (probe, update,
+    insert) elsewhere.
+    """
+    rows = _merge_rows(rows, key_columns, increment_columns)
+    if not rows:
+        return
+
+    set_values = set_values or {}
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            **{column: table.c[column] + stmt.inserted[column] for column in increment_columns},
+            **set_values,
+        )
+        await db.execute(stmt)
+        return
+
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        chunk_size = max(1, MAX_BOUND_PARAMETERS // len(rows[0]))
+        for start in range(0, len(rows), chunk_size):
+            stmt = dialect_insert(table).values(rows[start:start + chunk_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c[column] for column in key_columns],
+                set_={
+                    **{column: table.c[column] + stmt.excluded[column] for column in increment_columns},
+                    **set_values,
+                },
+            )
+            await db.execute(stmt)
+        return
+
+    if len(key_columns) == 1:
+        key_filter = table.c[key_columns[0]].in_([row[key_columns[0]] for row in rows])
+    else:
+        key_filter = tuple_(*(table.c[column] for column in key_columns)).in_(
+            [tuple(row[column] for column in key_columns) for row in rows]
+        )
+    result = await db.execute(select(*(table.c[column] for column in key_columns)).where(key_filter))
+    existing = {tuple(key) for key in result.all()}
+
+    to_update = [row for row in rows if tuple(row[column] for column in key_columns) in existing]
+    to_insert = [row for row in rows if tuple(row[column] for column in key_columns) not in existing]
+
+    if to_update:
+        stmt = (
+            update(table)
+            .where(and_(*(table.c[column] == bindparam(f"key_{column}") for column in key_columns)))
+            .values({
+                **{column: table.c[column] + bindparam(f"inc_{column}") for column in increment_columns},
+                **set_values,
+            })
+        )
+        await db.execute(
+            stmt,
+            [
+                {
+                    **{f"key_{column}": row[column] for column in key_columns},
+                    **{f"inc_{column}": row[column] for column in increment_columns},
+                }
+                for row in to_update
+            ],
+        )
+
+    if to_insert:
+        await db.execute(insert(table), to_insert)
@@ -0,0 +1,183 @@
+"""Drive a mixed login/catalog/order/sale workload and report latency per route.
+
+By default the app is booted in-process over httpx's ASGI transport against a
+throwaway SQLite database, so no MySQL server or uvicorn is needed:
+
+    python -m benchmarks.loadtest --concurrency 20 --duration 30
+
+Pass --url to load an already running server instead (DATABASE_URL is then
+irrelevant and the target must be migrated and seeded).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import httpx
+from sqlalchemy.engine import make_url
+
+# (route label, weight); route labels are the templates results are grouped by
+WORKLOAD = (
+    ("POST /login", 1),
+    ("GET /products", 20),
+    ("GET /products/{product_id}", 25),
+    ("GET /suppliers", 5),
+    ("GET /inventory", 10),
+    ("POST /orders", 10),
+    ("POST /sales", 15),
+)
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, prefix: str, username: str, password: str, product_ids: list[int]):
+        self.client = client
+        self.prefix = prefix
+        self.username = username
+        self.password = password
+        self.product_ids = product_ids
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def login(self) -> dict:
+        response = await self.client.post(
+            f"{self.prefix}/login",
+            data={"username": self.username, "password": self.password},
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def request_for(self, route: str, rng: random.Random) -> tuple[str, str, dict]:
+        product_id = rng.choice(self.product_ids)
+        if route == "POST /login":
+            return "POST", "/login", {"data": {"username": self.username, "password": self.password}}
+        if route == "GET /products":
+            return "GET", "/products", {"params": {"limit": 50}}
+        if route == "GET /products/{product_id}":
+            return "GET", f"/products/{product_id}", {}
+        if route == "GET /suppliers":
+            return "GET", "/suppliers", {}
+        if route == "GET /inventory":
+            return "GET", "/inventory", {"params": {"limit": 50}}
+        if route == "POST /orders":
+            item = {"product_id": product_id, "quantity": rng.randint(5, 20), "unit_price": 10.0}
+            return "POST", "/orders", {"json": {"order_items": [item]}}
+        item = {"product_id": product_id, "quantity": rng.randint(1, 2)}
+        return "POST", "/sales", {"json": {"sale_items": [item]}}
+
+    async def user(self, user_id: int, deadline: float, headers: dict) -> None:
+        rng = random.Random(user_id)
+        routes, weights = zip(*WORKLOAD)
+        while time.perf_counter() < deadline:
+            route = rng.choices(routes, weights=weights)[0]
+            method, path, kwargs = self.request_for(route, rng)
+            started_at = time.perf_counter()
+            try:
+                response = await self.client.request(method, f"{self.prefix}{path}", headers=headers, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            self.latencies[route].append(time.perf_counter() - started_at)
+            if failed:
+                self.errors[route] += 1
+
+    async def run(self, concurrency: int, duration: float) -> float:
+        headers = await self.login()
+        started_at = time.perf_counter()
+        deadline = started_at + duration
+        await asyncio.gather(*(self.user(user_id, deadline, headers) for user_id in range(concurrency)))
+        return time.perf_counter() - started_at
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route, _ in WORKLOAD:
+            samples = sorted(self.latencies.get(route, []))
+            routes[route] = {
+                "requests": len(samples),
+                "errors": self.errors.get(route, 0),
+                "rps": round(len(samples) / elapsed, 1),
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+            }
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "errors": sum(route["errors"] for route in routes.values()),
+            "rps": round(total / elapsed, 1),
+            "routes": routes,
+        }
+
+def print_report(report: dict) -> None:
+    print(f"{report['requests']} requests in {report['elapsed_s']}s, {report['rps']} req/s, {report['errors']} errors")
+    print(f"{'route':<30}{'count':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for route, stats in report["routes"].items():
+        print(
+            f"{route:<30}{stats['requests']:>8}{stats['errors']:>8}{stats['rps']:>9}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+
+@asynccontextmanager
+async def in_process_client():
+    from backend.app import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            yield client
+
+async def main_async(args: argparse.Namespace) -> dict:
+    prefix = os.getenv("API_BASE_PREFIX", "")
+    if args.url:
+        client_context = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        client_context = in_process_client()
+
+    async with client_context as client:
+        load_test = LoadTest(client, prefix, args.username, args.password, list(range(1, args.products + 1)))
+        elapsed = await load_test.run(args.concurrency, args.duration)
+        return load_test.report(elapsed)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20, help="Number of simulated clients")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--url", help="Load a running server at this base URL instead of booting the app in-process")
+    parser.add_argument("--database-url", help="Database for the in-process app (default: a temporary SQLite file)")
+    parser.add_argument("--products", type=int, default=95, help="Product IDs 1..N are used in requests")
+    parser.add_argument("--username", default=os.getenv("DEFAULT_USERNAME", "admin"))
+    parser.add_argument("--password", default=os.getenv("DEFAULT_PASSWORD", "admin"))
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if not args.url:
+        # The engine is built at import time, so the environment has to be set before backend is imported
+        database_url = args.database_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/loadtest.db"
+        url = make_url(database_url)
+        if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+            parser.error("in-memory SQLite shares one connection between all sessions; use a file-backed URL")
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.setdefault("MIGRATE_ON_STARTUP", "true")
+        os.environ.setdefault("SEED_ON_STARTUP", "true")
+        os.environ.setdefault("DEFAULT_USERNAME", args.username)
+        os.environ.setdefault("DEFAULT_PASSWORD", args.password)
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
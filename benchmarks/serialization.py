@@ -0,0 +1,114 @@
+"""Compare list-response serialization paths on N-row result sets.
+
+Run with `python -m benchmarks.serialization --rows 10000`. Uses an in-memory SQLite
+database through the stdlib driver, so only the app's models and .env are needed.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic_core import to_json
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+import backend.utils  # noqa: F401  (initialises Base before the models module)
+from backend.utils.database import Base
+from backend.models import DBOrder, DBProduct, DBSupplier, GetProductsResponse
+
+def seed(engine, rows: int) -> None:
+    rng = random.Random(42)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(DBSupplier.__table__), [{"supplier_name": "Benchmark Supplier"}])
+        conn.execute(
+            insert(DBProduct.__table__),
+            [
+                {
+                    "product_name": f"Product {i}",
+                    "category": f"Category {i % 20}",
+                    "unit_price": round(rng.uniform(1, 500), 2),
+                    "supplier_id": 1,
+                }
+                for i in range(rows)
+            ],
+        )
+        conn.execute(
+            insert(DBOrder.__table__),
+            [
+                {
+                    "order_details": [
+                        {
+                            "product_id": rng.randint(1, rows),
+                            "supplier_id": 1,
+                            "quantity": 2,
+                            "unit_price": 9.5,
+                            "subtotal": 19.0,
+                        }
+                        for _ in range(3)
+                    ],
+                    "total_amount": 57.0,
+                    "timestamp": now - timedelta(minutes=i),
+                }
+                for i in range(rows)
+            ],
+        )
+
+def orders_orm(engine) -> bytes:
+    # Default get_orders path: ORM instances handed to jsonable_encoder
+    with Session(engine) as session:
+        orders = session.execute(select(DBOrder)).scalars().all()
+        return json.dumps(jsonable_encoder(orders)).encode()
+
+def orders_fast(engine) -> bytes:
+    with engine.connect() as conn:
+        rows = conn.execute(select(*DBOrder.__table__.columns)).all()
+        return to_json([row._asdict() for row in rows])
+
+def products_validated(engine) -> bytes:
+    # Default get_products path: build the response model, then response_model validates it again
+    with Session(engine) as session:
+        products = session.execute(select(DBProduct)).scalars().all()
+        content = GetProductsResponse(products=products)
+        validated = GetProductsResponse.model_validate(content.model_dump())
+        return json.dumps(jsonable_encoder(validated.model_dump(mode="json"))).encode()
+
+def products_fast(engine) -> bytes:
+    with engine.connect() as conn:
+        rows = conn.execute(select(*DBProduct.__table__.columns)).all()
+        return to_json({"count": None, "products": [row._asdict() for row in rows], "next_cursor": None})
+
+def measure(func, engine, repeat: int) -> float:
+    func(engine)  # warm up statement caches
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func(engine)
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings) * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    seed(engine, args.rows)
+
+    print(f"{args.rows} rows, median of {args.repeat} runs")
+    for name, baseline, fast in (
+        ("orders", orders_orm, orders_fast),
+        ("products", products_validated, products_fast),
+    ):
+        baseline_ms = measure(baseline, engine, args.repeat)
+        fast_ms = measure(fast, engine, args.repeat)
+        print(f"  {name:<10} default {baseline_ms:8.1f} ms   fast {fast_ms:8.1f} ms   {baseline_ms / fast_ms:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Benchmark suite for request hot paths, with JSON baselines and regression gates.
+
+Each data size runs in its own process against its own database, which is
+migrated, seeded and filled by the synthetic data generator on first use and
+reused afterwards:
+
+    python -m benchmarks.suite run --sizes 1000 100000 1000000 --output baseline.json
+    python -m benchmarks.suite run --compare-to baseline.json --threshold 10
+    python -m benchmarks.suite compare baseline.json current.json --threshold 10
+
+Timings are per call; `compare` exits with status 1 when any case's median is
+slower than the baseline by more than the threshold (percent).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+ITEMS_PER_REQUEST = 5
+LIST_PAGE_SIZE = 1000
+
+def summarize(timings: list[float]) -> dict:
+    ordered = sorted(timings)
+    mean = statistics.fmean(ordered)
+    return {
+        "rounds": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+        "mean_ms": round(mean * 1000, 4),
+        "median_ms": round(statistics.median(ordered) * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "stddev_ms": round(statistics.pstdev(ordered) * 1000, 4),
+        "ops_per_s": round(1 / mean, 1) if mean else None,
+    }
+
+async def measure(func: Callable[[], Awaitable], min_time: float, min_rounds: int, max_rounds: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await func()
+
+    timings = []
+    started_at = time.perf_counter()
+    while len(timings) < max_rounds and (len(timings) < min_rounds or time.perf_counter() - started_at < min_time):
+        call_started_at = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - call_started_at)
+    return summarize(timings)
+
+async def prepare_dataset(size: int) -> dict[str, int]:
+    from sqlalchemy import select, func
+    from backend.utils import AsyncSessionLocal
+    from backend.migrations import upgrade
+    from backend.utils.seed_data import seed_database
+    from backend.utils.synthetic_data import generate_dataset
+    from backend.models import DBProduct, DBSale
+
+    await upgrade()
+    async with AsyncSessionLocal() as session:
+        await seed_database(session)
+        products = (await session.execute(select(func.count()).select_from(DBProduct))).scalar_one()
+        sales = (await session.execute(select(func.count()).select_from(DBSale))).scalar_one()
+        if products < size or sales < size:
+            await generate_dataset(
+                session,
+                suppliers=max(10, size // 1000) if products < size else 0,
+                products=max(0, size - products),
+                orders=0,
+                sales=max(0, size - sales),
+                seed=size,
+            )
+        products = (await session.execute(select(func.max(DBProduct.product_id)))).scalar_one()
+    return {"max_product_id": products}
+
+async def run_cases(size: int, args: argparse.Namespace) -> dict[str, dict]:
+    import httpx
+    from backend.app import app
+    from backend.utils import AsyncSessionLocal, close_db
+    from backend.utils.auth import create_access_token, get_current_user
+    from backend.routes.orders_routes import enrich_order_items
+    from backend.routes.sales_routes import enrich_sale_items, inventory_is_sufficient
+
+    dataset = await prepare_dataset(size)
+    rng = random.Random(size)
+    username = os.getenv("DEFAULT_USERNAME")
+    prefix = os.getenv("API_BASE_PREFIX", "")
+    token = create_access_token(username)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def random_items(**fields) -> list[dict]:
+        return [
+            {"product_id": rng.randint(1, dataset["max_product_id"]), **fields}
+            for _ in range(ITEMS_PER_REQUEST)
+        ]
+
+    async def create_token() -> None:
+        create_access_token(username)
+
+    results = {}
+    async with AsyncSessionLocal() as session:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            cases = {
+                # Fresh random products per call, so larger catalogs see more cache misses
+                "enrich_order_items": lambda: enrich_order_items(session, random_items(quantity=2, unit_price=10.0)),
+                "enrich_sale_items": lambda: enrich_sale_items(session, random_items(quantity=1)),
+                "inventory_is_sufficient": lambda: inventory_is_sufficient(session, random_items(quantity=1)),
+                "get_current_user": lambda: get_current_user(token, session),
+                "create_access_token": create_token,
+                "list_products": lambda: client.get(f"{prefix}/products", params={"limit": LIST_PAGE_SIZE}, headers=headers),
+                "list_sales": lambda: client.get(f"{prefix}/sales", params={"limit": LIST_PAGE_SIZE}, headers=headers),
+            }
+            for name, func in cases.items():
+                if args.cases and name not in args.cases:
+                    continue
+                results[f"{name}[{size}]"] = await measure(func, args.min_time, args.min_rounds, args.max_rounds, args.warmup)
+                print(f"  {name}[{size}]: median {results[f'{name}[{size}]']['median_ms']} ms", file=sys.stderr)
+
+    await close_db()
+    return results
+
+def worker_command(args: argparse.Namespace) -> None:
+    results = asyncio.run(run_cases(args.size, args))
+    Path(args.result_file).write_text(json.dumps(results))
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_command(args: argparse.Namespace) -> None:
+    data_dir = Path(args.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    for size in args.sizes:
+        database_url = (
+            args.database_url.format(size=size)
+            if args.database_url
+            else f"sqlite+aiosqlite:///{(data_dir / f'bench-{size}.db').resolve()}"
+        )
+        print(f"Size {size} ({database_url.split('://')[0]})", file=sys.stderr)
+
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as result_file:
+            result_path = result_file.name
+        command = [
+            sys.executable, "-m", "benchmarks.suite", "worker",
+            "--size", str(size),
+            "--result-file", result_path,
+            "--min-time", str(args.min_time),
+            "--min-rounds", str(args.min_rounds),
+            "--max-rounds", str(args.max_rounds),
+            "--warmup", str(args.warmup),
+            *(["--cases", *args.cases] if args.cases else []),
+        ]
+        subprocess.run(command, env={**os.environ, "DATABASE_URL": database_url}, check=True)
+        results.update(json.loads(Path(result_path).read_text()))
+        os.unlink(result_path)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fast_serialization": os.getenv("FAST_SERIALIZATION_ENABLED", "false"),
+        "sizes": args.sizes,
+        "results": results,
+    }
+    output = Path(args.output or f"benchmarks/results/{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {output}", file=sys.stderr)
+
+    if args.compare_to:
+        sys.exit(compare(json.loads(Path(args.compare_to).read_text()), report, args.threshold))
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    regressions = 0
+    print(f"{'case':<40}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+    for name, stats in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<40}{'-':>14}{stats['median_ms']:>14}{'new':>10}")
+            continue
+
+        change = (stats["median_ms"] - base["median_ms"]) / base["median_ms"] * 100 if base["median_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{name:<40}{base['median_ms']:>14}{stats['median_ms']:>14}{change:>+9.1f}%{flag}")
+
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    if missing:
+        print(f"Not run in current results: {', '.join(missing)}")
+    print(f"{regressions} regression(s) above {threshold}%")
+    return 1 if regressions else 0
+
+def compare_command(args: argparse.Namespace) -> None:
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    sys.exit(compare(baseline, current, args.threshold))
+
+def add_timing_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to keep sampling each case")
+    parser.add_argument("--min-rounds", type=int, default=5)
+    parser.add_argument("--max-rounds", type=int, default=10000)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--cases", nargs="*", help="Only run these cases")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Run the suite and write a JSON report")
+    run.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    run.add_argument("--database-url", help="Database URL template with a {size} placeholder (default: SQLite files in --data-dir)")
+    run.add_argument("--data-dir", default=".benchmarks", help="Where the per-size SQLite databases are kept between runs")
+    run.add_argument("--output", help="Report path (default: benchmarks/results/<timestamp>.json)")
+    run.add_argument("--compare-to", help="Baseline report to gate against after the run")
+    run.add_argument("--threshold", type=float, default=10.0, help="Allowed median slowdown in percent")
+    add_timing_arguments(run)
+    run.set_defaults(handler=run_command)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two reports and flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Allowed median slowdown in percent")
+    compare_parser.set_defaults(handler=compare_command)
+
+    worker = subparsers.add_parser("worker", help=argparse.SUPPRESS)
+    worker.add_argument("--size", type=int, required=True)
+    worker.add_argument("--result-file", required=True)
+    add_timing_arguments(worker)
+    worker.set_defaults(handler=worker_command)
+
+    return parser
+
+def main() -> None:
+    args = build_parser().parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()